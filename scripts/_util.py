@@ -0,0 +1,344 @@
+"""
+Shared helpers for the cluster launcher and test scripts.
+Everything here is I/O-bound (RPC round-trips, process start/stop), so waits
+are tuned through concurrency and polling cadence rather than CPU work.
+"""
+import os
+import sys
+import argparse
+import json
+import time
+import signal
+import tempfile
+import functools
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIGKILL = getattr(signal, 'SIGKILL', signal.SIGTERM)
+# Node ids this process has killed and not yet restarted; polls skip them instead of waiting on an RPC
+_DEAD = set()
+# (cluster, node_id) -> Popen of nodes this process started; kill_node signals and reaps them directly
+_PROCS = {}
+# base_port -> id of the last node find_leader saw as Leader, probed first next time
+_LAST_LEADER = {}
+# Default gap between polls in wait_until: lower reacts faster, higher costs less CPU and fewer RPCs
+POLL_INTERVAL = 0.05
+
+def base_port(default=5000):
+    """--base-port of the cluster a test script should target (node i listens on base + i)."""
+    p = argparse.ArgumentParser()
+    p.add_argument('--base-port', type=int, default=default)
+    return p.parse_known_args()[0].base_port
+
+@functools.lru_cache(maxsize=None)
+def comm(base_port=None):
+    """
+    Shared probe Communicator, built once per cluster so polling loops don't
+    reconstruct a Node or new channels on every query. The probe Node skips
+    consensus setup, so it never reads node 1's WAL.
+    Callers must have put src/ on sys.path.
+    """
+    from infrastructure.node import Node
+    from infrastructure.comms import Communicator
+    return Communicator(Node(1, base_port=base_port, probe_only=True))
+
+@functools.lru_cache(maxsize=None)
+def peers(base_port=5000, count=5):
+    """Peer dicts for nodes 1..count, built once per cluster. Treat them as read-only."""
+    return tuple({'id': i, 'ip': '127.0.0.1', 'port': base_port + i} for i in range(1, count + 1))
+
+PEERS = peers()
+PBFT_PEERS = peers(6000, 4)
+
+def peer(nid, base_port=5000):
+    return peers(base_port)[nid - 1]
+
+def iter_states(comm, base_port=5000, ids=range(1, 6)):
+    """
+    Yield (id, peer, reply or None) for every node. One GetClusterState round-trip to the
+    first node that answers; if none does, get_state on every node concurrently, yielded
+    in completion order. Closing the generator early abandons the outstanding RPCs.
+    Nodes we killed report None.
+    """
+    for nid in ids:
+        if nid in _DEAD: continue
+        nodes = comm.get_cluster_state(peer(nid, base_port))
+        if nodes is None: continue
+        by_id = {n.node_id: n for n in nodes if n.state != 'OFFLINE' and n.node_id not in _DEAD}
+        for i in ids: yield i, peer(i, base_port), by_id.get(i)
+        return
+    def _poll(nid):
+        p = peer(nid, base_port)
+        return nid, p, None if nid in _DEAD else comm.get_state(p)
+    ex = ThreadPoolExecutor(max_workers=len(ids))
+    try:
+        for f in as_completed([ex.submit(_poll, nid) for nid in ids]): yield f.result()
+    finally: ex.shutdown(wait=False, cancel_futures=True)
+
+def poll_states(comm, base_port=5000, ids=range(1, 6)):
+    """State of every node as {id: (peer, reply or None)}; a sweep costs the slowest RPC, not the sum."""
+    return {nid: (p, s) for nid, p, s in iter_states(comm, base_port, ids)}
+
+def snapshot(comm, base_port=5000, ids=range(1, 6)):
+    """Reachable nodes as {id: {'info', 'state', 'term', 'log', 'commit'}}; unreachable ones are left out."""
+    return {nid: {'info': p, 'state': s.state, 'term': s.term, 'log': s.log_length, 'commit': s.commit_index}
+            for nid, (p, s) in poll_states(comm, base_port, ids).items() if s}
+
+def read_key(comm, key, base_port=5000, ids=range(1, 6)):
+    """get_data(key) on every node concurrently: {id: value, or None if unreachable/missing}."""
+    def _read(nid):
+        d = comm.get_data(peer(nid, base_port), key)
+        return nid, d.value if d and d.success else None
+    with ThreadPoolExecutor(max_workers=len(ids)) as ex: return dict(ex.map(_read, ids))
+
+def port_open(port, host='127.0.0.1', timeout=0.05):
+    """True if something accepts TCP connections on host:port."""
+    with socket.socket() as s:
+        s.settimeout(timeout)
+        return s.connect_ex((host, port)) == 0
+
+def wait_cluster_ready(base_port=5000, count=5, timeout=5.0):
+    """Poll until nodes 1..count all accept connections; True if they did within `timeout`."""
+    ports = [p['port'] for p in peers(base_port, count)]
+    return wait_until(lambda: all(port_open(port) for port in ports), timeout)
+
+def wait_committed(comm, target, base_port=5000, ids=range(1, 6), timeout=2.0):
+    """
+    Poll until every node in `ids` reports commit_index >= target (a log length).
+    Returns the final poll_states sweep, or None on timeout.
+    """
+    def _done():
+        states = poll_states(comm, base_port, ids)
+        return states if all(s and s.commit_index >= target for _, s in states.values()) else None
+    return wait_until(_done, timeout)
+
+def watch_states(comm, predicate, base_port=5000, ids=range(1, 6), timeout=3.0):
+    """
+    Subscribe to every node's state stream and return {id: GetStateReply} as soon as
+    predicate(states) holds, or None after `timeout`. Nodes that are still starting
+    are waited for, so this can follow a restart without polling.
+    """
+    states, lock, done = {}, threading.Lock(), threading.Event()
+    streams = {nid: comm.subscribe_state(peer(nid, base_port), timeout=timeout) for nid in ids}
+    def _follow(nid):
+        try:
+            for s in streams[nid][1]:
+                with lock:
+                    states[nid] = s
+                    if predicate(dict(states)): done.set()
+        except Exception: pass  # cancelled, deadline exceeded or node down
+    workers = [threading.Thread(target=_follow, args=(nid,), daemon=True) for nid in ids]
+    for w in workers: w.start()
+    ok = done.wait(timeout)
+    for _, call in streams.values(): call.cancel()
+    for w in workers: w.join(timeout=1.0)
+    for chan, _ in streams.values(): chan.close()
+    with lock: return dict(states) if ok else None
+
+def find_leader(comm, base_port=5000, exclude=()):
+    """
+    (id, peer, GetStateReply) of a node reporting Leader, ignoring `exclude`; (None, None, None) if none.
+    Leadership is usually stable between calls, so the last leader seen is asked directly first.
+    """
+    nid = _LAST_LEADER.get(base_port)
+    if nid is not None and nid not in exclude and nid not in _DEAD:
+        p = peer(nid, base_port)
+        s = comm.get_state(p)
+        if s and s.state == 'Leader': return nid, p, s
+    # Stops at the first Leader, without waiting on slower or dead peers
+    for nid, p, s in iter_states(comm, base_port):
+        if s and s.state == 'Leader' and nid not in exclude:
+            _LAST_LEADER[base_port] = nid
+            return nid, p, s
+    _LAST_LEADER.pop(base_port, None)
+    return None, None, None
+
+def _pidfile(cluster):
+    return os.path.join(tempfile.gettempdir(), f"{cluster}_cluster_pids.json")
+
+def save_pids(cluster, pids):
+    """Persist the {node_id: pid} map of a freshly spawned cluster."""
+    with open(_pidfile(cluster), 'w') as f: json.dump(pids, f)
+
+def load_pids(cluster):
+    """Return the persisted {node_id: pid} map, or None if no cluster was recorded."""
+    try:
+        with open(_pidfile(cluster), 'r') as f: return {int(k): v for k, v in json.load(f).items()}
+    except (OSError, ValueError): return None
+
+def clear_pids(cluster):
+    try: os.remove(_pidfile(cluster))
+    except OSError: pass
+
+def _runs(pid, script):
+    """Cheap identity check: is `pid` alive and running `script`? (guards against recycled PIDs)"""
+    try:
+        with open(f"/proc/{pid}/cmdline", 'rb') as f: return script.encode() in f.read()
+    except OSError:
+        if os.path.isdir('/proc'): return False
+    # No procfs (Windows/macOS): fall back to psutil
+    import psutil
+    try: return any(script in c for c in psutil.Process(pid).cmdline())
+    except (psutil.NoSuchProcess, psutil.AccessDenied): return False
+
+def _alive(pid, script):
+    try:
+        # Reap our own children so they don't linger as zombies
+        if os.waitpid(pid, os.WNOHANG) != (0, 0): return False
+    except ChildProcessError: pass
+    # Zombies have an empty cmdline, so this also treats exited-but-unreaped nodes as gone
+    return _runs(pid, script)
+
+def signal_pids(pids, script, kill=False, grace=0.5):
+    """
+    SIGTERM the given PIDs directly, skipping any PID that no longer runs `script`.
+    With kill=True, anything still alive after `grace` seconds gets SIGKILL.
+    Returns how many processes were signalled.
+    """
+    sent = []
+    for pid in pids:
+        if not _runs(pid, script): continue
+        try: os.kill(pid, signal.SIGTERM)
+        except OSError: continue
+        sent.append(pid)
+    if kill:
+        deadline = time.monotonic() + grace
+        pending = [p for p in sent if _alive(p, script)]
+        while pending and time.monotonic() < deadline:
+            time.sleep(0.02)
+            pending = [p for p in pending if _alive(p, script)]
+        for pid in pending:
+            try: os.kill(pid, SIGKILL)
+            except OSError: pass
+    return len(sent)
+
+def start_node(nid, cluster='raft', **kwargs):
+    """(Re)start one Raft node and record its PID so kill_node can find it without a process scan."""
+    proc = spawn(['src/main.py', '--id', str(nid)], **kwargs)
+    _PROCS[cluster, nid] = proc
+    _DEAD.discard(nid)
+    pids = load_pids(cluster) or {}
+    pids[nid] = proc.pid
+    save_pids(cluster, pids)
+    return proc
+
+def python_procs():
+    """
+    Iterate Python processes only. The name comes from /proc/<pid>/stat, so the
+    costlier cmdline read is left to the few survivors.
+    """
+    import psutil
+    for proc in psutil.process_iter(['name']):
+        if 'python' in (proc.info['name'] or '').lower(): yield proc
+
+def script_of(cmd):
+    """The script an interpreter argv list runs: spawn() always puts it at argv[1]."""
+    return cmd[1] if len(cmd) > 1 else ''
+
+def _id_arg(cmd):
+    """The `--id` token of an argv list, or None (a token, so 1 never matches 10)."""
+    try: return cmd[cmd.index('--id') + 1]
+    except (ValueError, IndexError): return None
+
+def _kill(nid, cluster, script):
+    """
+    SIGKILL one node without waiting. Returns its Popen if this process started it,
+    True if it was killed through the pidfile, None if it has to be found by a scan.
+    """
+    proc = _PROCS.pop((cluster, nid), None)
+    if proc is not None and proc.poll() is None:
+        proc.kill()
+        return proc
+    pid = (load_pids(cluster) or {}).get(nid)
+    if pid is not None and _runs(pid, script):
+        try:
+            os.kill(pid, SIGKILL)
+            return True
+        except OSError: pass
+    return None
+
+def kill_nodes(nids, cluster='raft', script='src/main.py'):
+    """
+    Hard-kill several nodes to simulate crashes. Every node is signalled before any
+    is waited on; nodes this process started are then reaped together, which closes
+    their sockets before we return. Nodes with no live PID on record are found in a
+    single process scan. Returns {id: killed}.
+    """
+    found = {nid: _kill(nid, cluster, script) for nid in nids}
+    missing = {str(nid) for nid, r in found.items() if r is None}
+    if missing:
+        import psutil
+        for proc in python_procs():
+            try:
+                cmd = proc.cmdline()
+                nid = _id_arg(cmd)
+                if nid in missing and script_of(cmd).endswith(script):
+                    # The cmdline match is the identity check; psutil's kill() would re-verify it
+                    os.kill(proc.pid, SIGKILL)
+                    found[int(nid)] = True
+                    missing.discard(nid)
+                    if not missing: break
+            except (psutil.NoSuchProcess, psutil.AccessDenied, OSError): pass
+    deadline = time.monotonic() + 1.0
+    for r in found.values():
+        if isinstance(r, subprocess.Popen):
+            try: r.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired: pass
+    killed = {nid: bool(r) for nid, r in found.items()}
+    _DEAD.update(nid for nid, ok in killed.items() if ok)
+    return killed
+
+def kill_node(nid, cluster='raft', script='src/main.py'):
+    """Hard-kill one node to simulate a crash (see kill_nodes)."""
+    return kill_nodes([nid], cluster, script)[nid]
+
+def wait_until(predicate, timeout=5.0, interval=POLL_INTERVAL):
+    """
+    Poll `predicate` until it returns truthy or `timeout` seconds pass.
+    Returns the last result, so callers can tell success from timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        result = predicate()
+        if result or time.monotonic() >= deadline: return result
+        time.sleep(interval)
+
+def wait_snapshot(take, cond, timeout=5.0, interval=POLL_INTERVAL):
+    """
+    Call `take` until cond(snapshot) holds or `timeout` passes, returning the last
+    snapshot either way, so a wait also hands the caller the state it waited for.
+    """
+    last = None
+    def _check():
+        nonlocal last
+        last = take()
+        return cond(last)
+    wait_until(_check, timeout, interval)
+    return last
+
+def spawn(args, python=sys.executable, **kwargs):
+    """
+    Start a Python script from the project root.
+    Popen only takes the posix_spawn (vfork) fast path when cwd is None and
+    close_fds is False, so the root is made the working directory up front and
+    the per-spawn fd sweep is skipped (Python-created fds are non-inheritable).
+    Nodes inherit the caller's stdout/stderr unless redirected: their log lines are
+    what test_all keeps for failure reports, and no /dev/null is opened per spawn.
+    """
+    if os.getcwd() != ROOT: os.chdir(ROOT)
+    return subprocess.Popen([python] + list(args), close_fds=False, **kwargs)
+
+def wait_for_interrupt():
+    """
+    Block the main thread until Ctrl+C or SIGTERM without periodic wakeups.
+    Both surface as KeyboardInterrupt so callers keep a single shutdown path.
+    """
+    if not hasattr(signal, 'pause'):
+        # Windows: no signal.pause, but a long sleep is still interrupted by Ctrl+C
+        while True: time.sleep(3600)
+    def _interrupt(*_): raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, _interrupt)
+    while True: signal.pause()
@@ -3,29 +3,35 @@ Helper script to restart the cluster
 Stops all running nodes and starts fresh ones
 """
 import subprocess
-import time
-import sys
 import os
-import psutil
+import selectors
+from _util import SIGKILL, script_of, PEERS, port_open, wait_until, wait_cluster_ready, spawn, save_pids, load_pids, clear_pids, signal_pids, python_procs
 
 def kill_existing_nodes():
     """Kill any existing node processes"""
     print("Stopping existing nodes...")
     killed = 0
     
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            cmdline = proc.info['cmdline']
-            if cmdline and 'python' in cmdline[0].lower() and 'src/main.py' in ' '.join(cmdline):
-                print(f"  Killing process {proc.info['pid']}: {' '.join(cmdline)}")
-                proc.kill()
-                killed += 1
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
+    pids = load_pids('raft')
+    if pids is not None:
+        # Fast path: the PIDs recorded at spawn time, no system-wide scan
+        killed = signal_pids(pids.values(), 'main.py', kill=True)
+        clear_pids('raft')
+    else:
+        import psutil
+        for proc in python_procs():
+            try:
+                cmdline = proc.cmdline()
+                if script_of(cmdline).endswith('src/main.py'):
+                    print(f"  Killing process {proc.pid}: {' '.join(cmdline)}")
+                    os.kill(proc.pid, SIGKILL)
+                    killed += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
+                pass
     
     if killed > 0:
         print(f"Killed {killed} node(s), waiting for ports to free...")
-        time.sleep(2)
+        wait_until(lambda: not any(port_open(p['port']) for p in PEERS), timeout=2.0)
     else:
         print("No existing nodes found")
 
@@ -35,25 +41,54 @@ def start_nodes():
     processes = []
     
     for i in range(1, 6):
-        cmd = [sys.executable, 'src/main.py', '--id', str(i)]
         print(f"  Starting Node {i}...")
-        proc = subprocess.Popen(
-            cmd,
-            cwd=os.path.dirname(os.path.abspath(__file__)) + '/..',
+        proc = spawn(
+            ['src/main.py', '--id', str(i)],
             stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
+            stderr=subprocess.STDOUT
         )
         processes.append((i, proc))
-        time.sleep(0.3)
+    save_pids('raft', {i: proc.pid for i, proc in processes})
     
     print(f"\nAll 5 nodes started")
-    print("Waiting for election...")
-    time.sleep(1.0)
+    print("Waiting for nodes to listen...")
+    wait_cluster_ready()
     
     return processes
 
+def monitor_output(processes):
+    """
+    Relay node output line by line, waking only when some node has written data.
+    Partial lines are buffered per node so a silent node never blocks the others.
+    """
+    if os.name == 'nt':
+        # Pipes cannot be registered with a selector on Windows
+        while True:
+            for node_id, proc in processes:
+                line = proc.stdout.readline()
+                if line:
+                    print(f"[Node {node_id}] {line.decode(errors='replace').strip()}")
+    
+    sel = selectors.DefaultSelector()
+    buffers = {}
+    for node_id, proc in processes:
+        os.set_blocking(proc.stdout.fileno(), False)
+        sel.register(proc.stdout, selectors.EVENT_READ, node_id)
+        buffers[node_id] = bytearray()
+    
+    while sel.get_map():
+        for key, _ in sel.select(timeout=1.0):
+            data = os.read(key.fd, 4096)
+            if not data:
+                sel.unregister(key.fileobj)
+                continue
+            buf = buffers[key.data]
+            buf += data
+            *lines, rest = buf.split(b'\n')
+            for line in lines:
+                print(f"[Node {key.data}] {line.decode(errors='replace').strip()}")
+            buffers[key.data] = bytearray(rest)
+
 if __name__ == '__main__':
     try:
         kill_existing_nodes()
@@ -61,16 +96,11 @@ if __name__ == '__main__':
         
         print("\nPress Ctrl+C to stop all nodes\n")
         
-        # Monitor output
-        while True:
-            for node_id, proc in processes:
-                line = proc.stdout.readline()
-                if line:
-                    print(f"[Node {node_id}] {line.strip()}")
-            time.sleep(0.01)
+        monitor_output(processes)
             
     except KeyboardInterrupt:
         print("\n\nStopping all nodes...")
         for node_id, proc in processes:
             proc.terminate()
+        clear_pids('raft')
         print("Done.")
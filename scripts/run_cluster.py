@@ -1,32 +1,42 @@
-import subprocess
-import time
-import sys
 import os
+import argparse
+from _util import ROOT, spawn, save_pids, clear_pids, wait_cluster_ready, wait_for_interrupt
 
-def run_cluster(num_nodes=5):
+DEFAULT_BASE_PORT = 5000
+
+def run_cluster(num_nodes=5, base_port=DEFAULT_BASE_PORT, data_dir='.'):
     """
     Launch a local cluster of Raft nodes.
     Sets up the PYTHONPATH and starts each node as a separate subprocess.
+    A non-default base_port/data_dir gives an isolated cluster that can run beside others.
     """
     print(f"[INFO] Starting {num_nodes} Raft Nodes...")
     procs = []
-    root = os.path.join(os.path.dirname(__file__), '..')
     env = os.environ.copy()
-    env['PYTHONPATH'] = os.path.join(root, 'src')
+    env['PYTHONPATH'] = os.path.join(ROOT, 'src')
+    # Each isolated cluster keeps its own pidfile
+    name = 'raft' if base_port == DEFAULT_BASE_PORT else f'raft_{base_port}'
     
     for i in range(1, num_nodes + 1):
         # Allow stdout/stderr to inherit from parent for tracing as requested
-        p = subprocess.Popen([sys.executable, 'src/main.py', '--id', str(i)], 
-                             cwd=root, env=env)
+        p = spawn(['src/main.py', '--id', str(i), '--base-port', str(base_port), '--data-dir', data_dir], env=env)
         procs.append((i, p))
-        time.sleep(0.5)
+    save_pids(name, {i: p.pid for i, p in procs})
+    # Spawns don't block; report running once the slowest node is listening
+    if not wait_cluster_ready(base_port, num_nodes):
+        print("[WARN] Not every node is listening yet")
     
     print("[INFO] Raft Cluster running. Press Ctrl+C to stop.")
     try:
-        while True: time.sleep(1)
+        wait_for_interrupt()
     except KeyboardInterrupt:
         print("\n[INFO] Stopping Raft cluster...")
         for _, p in procs: p.terminate()
+        clear_pids(name)
 
 if __name__ == '__main__':
-    run_cluster()
+    p = argparse.ArgumentParser()
+    p.add_argument('--base-port', type=int, default=DEFAULT_BASE_PORT)
+    p.add_argument('--data-dir', default='.')
+    args = p.parse_args()
+    run_cluster(base_port=args.base_port, data_dir=os.path.abspath(args.data_dir))
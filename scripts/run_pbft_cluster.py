@@ -1,17 +1,21 @@
-import subprocess
-import sys
 import os
-import time
-import psutil
+from _util import ROOT, SIGKILL, script_of, PBFT_PEERS, peers, port_open, wait_until, spawn, save_pids, load_pids, clear_pids, signal_pids, python_procs, wait_for_interrupt
 
-# Define project root for consistent pathing
-root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-def kill_pbft_nodes():
+def kill_pbft_nodes(expected=4):
     """Find and terminate all running pBFT node processes."""
-    for f in psutil.process_iter(['pid', 'cmdline']):
+    pids = load_pids('pbft')
+    if pids is not None:
+        signal_pids(pids.values(), 'pbft_main.py', kill=True)
+        clear_pids('pbft')
+        return
+    killed = 0
+    for f in python_procs():
         try:
-            if f.info['cmdline'] and 'pbft_main.py' in ' '.join(f.info['cmdline']): f.kill()
+            if script_of(f.cmdline()).endswith('pbft_main.py'):
+                os.kill(f.pid, SIGKILL)
+                killed += 1
+                # Stop scanning once the whole cluster is accounted for
+                if killed >= expected: break
         except: pass
 
 def start_pbft_cluster(num=4, mal=None):
@@ -24,25 +28,29 @@ def start_pbft_cluster(num=4, mal=None):
     """
     mal = mal or []
     kill_pbft_nodes()
-    time.sleep(1)
+    # Old nodes are gone once nothing listens on their ports
+    ports = [p['port'] for p in peers(6000, num)]
+    wait_until(lambda: not any(port_open(port) for port in ports), timeout=1.0)
     
     procs = []
     env = os.environ.copy()
-    env['PYTHONPATH'] = os.path.join(root, 'src')
+    env['PYTHONPATH'] = os.path.join(ROOT, 'src')
     
     for i in range(1, num + 1):
-        cmd = [sys.executable, 'src/pbft_main.py', '--id', str(i)]
+        cmd = ['src/pbft_main.py', '--id', str(i)]
         if i in mal: cmd.append('--malicious')
         # Allow stdout/stderr to inherit from parent for tracing
-        p = subprocess.Popen(cmd, cwd=root, env=env)
+        p = spawn(cmd, env=env)
         procs.append(p)
+    save_pids('pbft', {i: p.pid for i, p in enumerate(procs, 1)})
     return procs
 
 if __name__ == '__main__':
     start_pbft_cluster()
+    wait_until(lambda: all(port_open(p['port']) for p in PBFT_PEERS), timeout=10.0)
     print("[INFO] pBFT Cluster started. Press Ctrl+C to stop.")
     try:
-        while True: time.sleep(1)
+        wait_for_interrupt()
     except KeyboardInterrupt:
         kill_pbft_nodes()
         print("\n[INFO] pBFT Cluster stopped.")
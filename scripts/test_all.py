@@ -1,10 +1,21 @@
 import sys
 import os
-import time
+import shutil
+import tempfile
 import subprocess
-import glob
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 import psutil
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from _util import script_of, spawn, wait_until, wait_cluster_ready, find_leader, comm
+
+# Script paths whose processes belong to the consensus cluster
+NODE_SCRIPTS = ('src/main.py', 'src/pbft_main.py', 'scripts/run_cluster.py')
+# Script output kept in memory for the failure summary
+TAIL_LINES, TAIL_CHARS = 50, 500
+
 class TestRunner:
     """
     Automated test runner for the Raft and pBFT consensus cluster.
@@ -13,44 +24,80 @@ class TestRunner:
         self.python = python_path
         self.root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.results = []
+        self.tails = {}
+        # (pid, create_time) of processes already inspected and found unrelated; repeat cleanups
+        # only look at new ones. The start time tells a reused PID apart from the process seen before.
+        self._seen_procs = set()
 
     def cleanup(self):
         """Clean up stale WAL data files and stop running node processes."""
         print("[INFO] Cleaning up environment...")
         
-        # Remove WAL files
-        for f in glob.glob("wal_data_*.json") + glob.glob("wal_data_*.json.tmp"):
-            try: os.remove(f)
-            except: pass
+        # Remove WAL files (single directory pass instead of two glob walks)
+        with os.scandir('.') as it:
+            for e in it:
+                if e.name.startswith('wal_data_') and e.name.endswith(('.json', '.jsonl', '.json.tmp', '.jsonl.tmp')):
+                    try: os.remove(e.path)
+                    except: pass
             
         # Kill only consensus node processes, not the test runner itself
-        current_pid = os.getpid()
-        for proc in psutil.process_iter(['pid', 'cmdline']):
+        me = psutil.Process()
+        self._seen_procs.add((me.pid, me.create_time()))
+        killed = []
+        for proc in psutil.process_iter():
             try:
-                cmd = proc.info['cmdline']
-                if not cmd: continue
-                cmd_str = ' '.join(cmd)
-                # Check for our consensus scripts but don't kill the current script
-                if proc.info['pid'] != current_pid:
-                    if 'src/main.py' in cmd_str or 'src/pbft_main.py' in cmd_str or 'scripts/run_cluster.py' in cmd_str:
-                        proc.kill()
+                key = (proc.pid, proc.create_time())
+                if key in self._seen_procs: continue
+                # Cheap name check first; only Python processes get their cmdline read
+                if 'python' not in proc.name().lower():
+                    self._seen_procs.add(key)
+                    continue
+                cmd = proc.cmdline()
+                if script_of(cmd).endswith(NODE_SCRIPTS):
+                    proc.kill()
+                    killed.append(proc)
+                else: self._seen_procs.add(key)
             except (psutil.NoSuchProcess, psutil.AccessDenied): pass
-        time.sleep(1)
+        # Returns as soon as the killed nodes are gone instead of always sleeping a second
+        psutil.wait_procs(killed, timeout=1)
+
+    def start_cluster(self, base_port=None, data_dir=None):
+        """Launch a Raft cluster; base_port/data_dir give an isolated one for a single test."""
+        args = ['scripts/run_cluster.py']
+        if base_port: args += ['--base-port', str(base_port), '--data-dir', data_dir]
+        return spawn(args, python=self.python)
 
-    def run_script(self, name, script_path, timeout=60):
-        """Execute a single test script and record its result."""
+    def _relay(self, stream, tail, prefix=''):
+        """Echo a script's output as it arrives, keeping only the most recent lines."""
+        for line in stream:
+            tail.append(line)
+            print(prefix + line, end='', flush=True)
+
+    def run_script(self, name, script_path, timeout=60, args=(), prefix=''):
+        """Execute a single test script, streaming its output, and record its result."""
         print(f"\n[TEST] {name}")
         env = os.environ.copy()
         env['PYTHONPATH'] = os.path.join(self.root, 'src')
+        tail = deque(maxlen=TAIL_LINES)
         try:
-            res = subprocess.run([self.python, script_path], cwd=self.root, env=env, timeout=timeout)
-            passed = res.returncode == 0
-            if not passed: print(f"[FAIL] {name}")
+            proc = spawn([script_path, *args], python=self.python, env=env,
+                         stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            # Nodes respawned by a test inherit this pipe and outlive it, so drain it on a daemon thread
+            threading.Thread(target=self._relay, args=(proc.stdout, tail, prefix), daemon=True).start()
+            try:
+                passed = proc.wait(timeout=timeout) == 0
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                raise
+            if not passed:
+                print(f"[FAIL] {name}")
+                self.tails[name] = ''.join(tail)[-TAIL_CHARS:]
             self.results.append((name, "[PASS]" if passed else "[FAIL]"))
 
             return passed
         except Exception as e:
             print(f"[ERROR] {name}: {e}")
+            self.tails[name] = ''.join(tail)[-TAIL_CHARS:]
             self.results.append((name, "[ERROR]"))
             return False
 
@@ -60,27 +107,47 @@ def main():
     runner.cleanup()
 
     print("\n[PHASE 1] RAFT CLUSTER")
-    # Allow node logs to reach console for tracing as requested
-    cluster = subprocess.Popen([sys.executable, 'scripts/run_cluster.py'], cwd=runner.root)
-    time.sleep(3)
-
-
-    raft_tests = [
+    # Tests that never kill or partition nodes each get a private cluster and run concurrently
+    parallel_tests = [
         ("Leader Election", "scripts/test_election.py"),
+        ("Log Replication", "scripts/test_replication.py")
+    ]
+    # Chaos tests find nodes by --id across the host, so they run one at a time on the shared cluster
+    serial_tests = [
         ("Leader Failure", "scripts/test_leader_failure.py"),
-        ("Log Replication", "scripts/test_replication.py"),
         ("Network Partition", "scripts/test_network_partition.py"),
         ("Persistence", "scripts/test_persistence.py"),
         ("Node Rejoin", "scripts/test_node_rejoin.py"),
         ("Split Vote Recovery", "scripts/test_split_vote.py")
     ]
 
-    all_passed = True
-    for name, path in raft_tests:
+    # Allow node logs to reach console for tracing as requested
+    cluster = runner.start_cluster()
+    ports = [5000 + 100 * (i + 1) for i in range(len(parallel_tests))]
+    dirs = [tempfile.mkdtemp(prefix='raft_test_') for _ in parallel_tests]
+    isolated = [runner.start_cluster(port, d) for port, d in zip(ports, dirs)]
+    # Start testing once every cluster is listening and has elected a leader
+    for port in [5000] + ports: wait_cluster_ready(port)
+    wait_until(lambda: all(find_leader(comm(port), port)[0] for port in [5000] + ports), timeout=5.0)
+    for port in [5000] + ports: comm(port).close()
+
+    print("\n=============")
+    def _isolated(test, port):
+        name, path = test
+        return runner.run_script(name, path, args=('--base-port', str(port)), prefix=f"[{name}] ")
+    with ThreadPoolExecutor(max_workers=len(parallel_tests)) as ex:
+        all_passed = all(list(ex.map(_isolated, parallel_tests, ports)))
+    for c in isolated:
+        c.terminate()
+        c.wait()
+    for d in dirs: shutil.rmtree(d, ignore_errors=True)
+
+    for name, path in serial_tests:
         print("\n=============")
         if not runner.run_script(name, path): all_passed = False
     
     cluster.terminate()
+    cluster.wait()
     runner.cleanup()
 
     print("\n=============\n\n[PHASE 2] PBFT CLUSTER")
@@ -89,6 +156,8 @@ def main():
     print("\n=============\n\nTEST SUMMARY")
     for name, res in runner.results: print(f"{res.ljust(8)} {name}")
     print("="*60)
+    for name, tail in runner.tails.items():
+        print(f"\n[OUTPUT] Last lines of {name}:\n{tail}")
     sys.exit(0 if all_passed else 1)
 
 if __name__ == "__main__":
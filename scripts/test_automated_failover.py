@@ -1,36 +1,17 @@
-import sys, os, time, psutil
+import sys, os
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, os.path.join(project_root, 'src'))
-from infrastructure.node import Node
-from infrastructure.comms import Communicator
-
-def get_cluster_state():
-    temp_node = Node(1)
-    comm = Communicator(temp_node)
-    states = {}
-    for i in range(1, 6):
-        peer = {'id': i, 'ip': '127.0.0.1', 'port': 5000 + i if i != 1 else 5001}
-        res = comm.get_state(peer)
-        states[i] = {'state': res.state, 'term': res.term} if res else {'state': 'OFFLINE'}
-    return states
+from _util import PEERS, find_leader as _find_leader, wait_until, kill_node as _kill_node, comm as _comm
 
 def find_leader():
-    states = get_cluster_state()
-    for nid, s in states.items():
-        if s['state'] == 'Leader': return nid, s['term']
-    return None, None
+    """(id, term) of the current leader, or (None, None)."""
+    lid, _, res = _find_leader(_comm())
+    return lid, res.term if res else None
 
 def kill_node(nid):
     print(f"  Killing Node {nid}...")
-    for proc in psutil.process_iter(['pid', 'cmdline']):
-        try:
-            cmd = proc.info['cmdline']
-            if cmd and 'python' in cmd[0].lower() and 'src/main.py' in ' '.join(cmd) and f'--id {nid}' in ' '.join(cmd):
-                proc.kill()
-                return True
-        except: pass
-    return False
+    return _kill_node(nid)
 
 def test_automated_failover():
     print("RAFT AUTOMATED FAILOVER TEST")
@@ -44,10 +25,12 @@ def test_automated_failover():
         print(f"[FAIL] Could not kill Node {l_id}")
         return False
     
-    print("Waiting for re-election (2s)...")
-    time.sleep(2.0)
+    print("Waiting for re-election (up to 3s)...")
+    def new_leader():
+        nid, t = find_leader()
+        return (nid, t) if nid not in (None, l_id) else None
+    new_l_id, new_term = wait_until(new_leader, timeout=3.0, interval=0.1) or (None, None)
     
-    new_l_id, new_term = find_leader()
     if not new_l_id:
         print("[FAIL] No new leader elected")
         return False
@@ -63,4 +46,6 @@ def test_automated_failover():
     return True
 
 if __name__ == '__main__':
-    sys.exit(0 if test_automated_failover() else 1)
+    try: ok = test_automated_failover()
+    finally: _comm().close()
+    sys.exit(0 if ok else 1)
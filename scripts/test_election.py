@@ -6,37 +6,29 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
-from infrastructure.node import Node
-from infrastructure.comms import Communicator
+from _util import base_port, poll_states, wait_until, comm as _comm
+
+BASE_PORT = base_port()
 
 def get_cluster_state():
     """Query all running nodes via RPC and return their current consensus states."""
-    temp_node = Node(1)
-    comm = Communicator(temp_node)
-    states = {}
-    for pid in range(1, 6):
-        peer = {'id': pid, 'ip': '127.0.0.1', 'port': 5000 + pid}
-        try:
-            res = comm.get_state(peer)
-            if res:
-                states[pid] = {'state': res.state, 'term': res.term}
-            else:
-                states[pid] = {'state': 'OFFLINE', 'term': -1}
-        except:
-            states[pid] = {'state': 'ERROR', 'term': -1}
-    return states
+    return {pid: {'state': res.state, 'term': res.term} if res else {'state': 'OFFLINE', 'term': -1}
+            for pid, (_, res) in poll_states(_comm(BASE_PORT), BASE_PORT).items()}
+
+def elected():
+    """Cluster state once exactly one node reports Leader, else None."""
+    states = get_cluster_state()
+    return states if sum(s['state'] == 'Leader' for s in states.values()) == 1 else None
 
 def test_election():
     """Verify that a single leader is elected and maintained in a stable cluster."""
     print("[INFO] Waiting for election to complete...")
-    time.sleep(1.0)
-    
-    states = get_cluster_state()
+    states = wait_until(elected, timeout=1.0) or get_cluster_state()
     leaders = [nid for nid, s in states.items() if s['state'] == 'Leader']
     
-    print("\nCluster State:")
-    for nid, s in sorted(states.items()):
-        print(f"  Node {nid}: {s['state']:10s} (term {s['term']})")
+    # Emit the whole table in one write
+    print("\nCluster State:\n" + "\n".join(f"  Node {nid}: {s['state']:10s} (term {s['term']})"
+                                         for nid, s in sorted(states.items())), flush=True)
     
     if len(leaders) != 1:
         print(f"[FAIL] Expected exactly 1 leader, but found {len(leaders)}")
@@ -45,13 +37,20 @@ def test_election():
     l_id = leaders[0]
     print(f"[PASS] Leader elected: Node {l_id}")
     
-    print("[INFO] Verifying leader stability (2 seconds)...")
-    time.sleep(2.0)
-    
-    states2 = get_cluster_state()
-    leaders2 = [nid for nid, s in states2.items() if s['state'] == 'Leader']
-    
-    if len(leaders2) == 1 and leaders2[0] == l_id:
+    print("[INFO] Verifying leader stability (up to 2 seconds)...")
+    # Back off 100ms -> 200ms -> 400ms...; a stable cluster passes after 3 consistent polls
+    deadline = time.monotonic() + 2.0
+    interval, stable = 0.1, 0
+    leaders2 = leaders
+    while stable < 3 and time.monotonic() < deadline:
+        time.sleep(interval)
+        states2 = get_cluster_state()
+        leaders2 = [nid for nid, s in states2.items() if s['state'] == 'Leader']
+        if leaders2 != [l_id]: break
+        stable += 1
+        interval = min(interval * 2, 0.5)
+    
+    if stable > 0 and leaders2 == [l_id]:
         print(f"[PASS] Leader stable: Node {l_id}")
         return True
     
@@ -59,4 +58,6 @@ def test_election():
     return False
 
 if __name__ == '__main__':
-    sys.exit(0 if test_election() else 1)
+    try: ok = test_election()
+    finally: _comm(BASE_PORT).close()
+    sys.exit(0 if ok else 1)
@@ -1,25 +1,16 @@
 import sys
 import os
-import time
-import subprocess
-import psutil
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
-from infrastructure.node import Node
-from infrastructure.comms import Communicator
+from _util import peer, read_key, wait_until, find_leader, start_node, kill_node, comm as _comm
 
 def get_leader():
     """Find and return the current leader's info and term."""
-    node = Node(1)
-    comm = Communicator(node)
-    for i in range(1, 6):
-        p = {'id': i, 'ip': '127.0.0.1', 'port': 5000 + i}
-        s = comm.get_state(p)
-        if s and s.state == 'Leader': return i, p, s.term
-    return None, None, 0
+    lid, p, s = find_leader(_comm())
+    return lid, p, s.term if s else 0
 
 def test_leader_failure():
     """Verify that a new leader is elected after the current leader crashes."""
@@ -29,21 +20,16 @@ def test_leader_failure():
         return False
     
     print(f"[INFO] Initial leader: Node {lid} (term {term})")
-    comm = Communicator(Node(1))
+    comm = _comm()
     comm.submit_command(lp, "SET status=alive")
-    time.sleep(1)
+    # Wait until followers have learned the commit index too; a new leader won't commit old-term entries on its own
+    wait_until(lambda: all(v == 'alive' for v in read_key(comm, "status").values()), timeout=2.0)
     
     print(f"[ACTION] Killing leader Node {lid}...")
-    for proc in psutil.process_iter(['pid', 'cmdline']):
-        try:
-            cmd = proc.info['cmdline']
-            if cmd and 'src/main.py' in ' '.join(cmd) and f'--id {lid}' in ' '.join(cmd):
-                proc.kill()
-                print(f"  Process {proc.pid} terminated.")
-        except: pass
+    if kill_node(lid): print(f"  Node {lid} terminated.")
         
-    print("[INFO] Waiting for re-election (3 seconds)...")
-    time.sleep(3)
+    print("[INFO] Waiting for re-election (up to 5 seconds)...")
+    wait_until(lambda: get_leader()[0] not in (None, lid))
     
     new_lid, new_lp, new_term = get_leader()
     if not new_lid or new_lid == lid:
@@ -52,6 +38,8 @@ def test_leader_failure():
     
     print(f"[PASS] New leader elected: Node {new_lid} (term {new_term})")
     
+    # The new leader may still be applying entries from the previous term
+    wait_until(lambda: (d := comm.get_data(new_lp, "status")) and d.value == 'alive', timeout=3.0)
     data = comm.get_data(new_lp, "status")
     print(f"  Data recovery check: status = {data.value if data else 'None'}")
     if not data or data.value != 'alive':
@@ -59,10 +47,10 @@ def test_leader_failure():
         return False
         
     print(f"[ACTION] Restarting Node {lid}...")
-    subprocess.Popen([sys.executable, 'src/main.py', '--id', str(lid)], cwd=project_root)
-    time.sleep(2)
+    start_node(lid)
     
-    p_old = {'id': lid, 'ip': '127.0.0.1', 'port': 5000 + lid}
+    p_old = peer(lid)
+    wait_until(lambda: (s := comm.get_state(p_old)) and s.state == 'Follower')
     s_old = comm.get_state(p_old)
     if s_old and s_old.state == 'Follower':
         print(f"[PASS] Node {lid} successfully rejoined as Follower")
@@ -1,24 +1,22 @@
 import sys
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
-from infrastructure.node import Node
-from infrastructure.comms import Communicator
+from _util import wait_snapshot, snapshot, peer, comm as _comm
 
 def get_cluster():
     """Returns state and peer information for all nodes."""
-    node = Node(1)
-    comm = Communicator(node)
-    cluster = {}
-    for i in range(1, 6):
-        p = {'id': i, 'ip': '127.0.0.1', 'port': 5000 + i}
-        s = comm.get_state(p)
-        if s: cluster[i] = {'info': p, 'state': s.state, 'term': s.term, 'log': s.log_length}
-    return node, comm, cluster
+    comm = _comm()
+    return comm.node, comm, snapshot(comm)
+
+def set_partitions(comm, blocked):
+    """Push {node_id: blocked_node_ids} to every listed node concurrently."""
+    with ThreadPoolExecutor(max_workers=len(blocked)) as ex:
+        list(ex.map(lambda i: comm.set_partition(peer(i), blocked_node_ids=blocked[i]), blocked))
 
 def test_partition():
     """Verify Raft safety during a 3-2 network partition (split-brain)."""
@@ -35,17 +33,11 @@ def test_partition():
     majority = [i for i in range(1, 6) if i not in minority]
     print(f"[ACTION] Creating partition: Majority {majority} VS Minority {minority}")
     
-    for i in majority:
-        p = {'id': i, 'ip': '127.0.0.1', 'port': 5000 + i}
-        comm.set_partition(p, blocked_node_ids=minority)
-    for i in minority:
-        p = {'id': i, 'ip': '127.0.0.1', 'port': 5000 + i}
-        comm.set_partition(p, blocked_node_ids=majority)
-    
-    print("[INFO] Waiting for re-election in majority partition (4 seconds)...")
-    time.sleep(4)
+    set_partitions(comm, {i: minority if i in majority else majority for i in range(1, 6)})
     
-    _, _, cluster = get_cluster()
+    print("[INFO] Waiting for re-election in majority partition (up to 6 seconds)...")
+    cluster = wait_snapshot(lambda: get_cluster()[2],
+                            lambda c: any(c.get(i, {}).get('state') == 'Leader' for i in majority), timeout=6.0)
     new_lid = next((nid for nid in majority if cluster.get(nid, {}).get('state') == 'Leader'), None)
     if not new_lid:
         print("[FAIL] No new leader elected in majority partition")
@@ -57,13 +49,10 @@ def test_partition():
     comm.submit_command(cluster[new_lid]['info'], "SET PartitionTest=Success")
     
     print("[ACTION] Healing network partition...")
-    for i in range(1, 6):
-        comm.set_partition({'id': i, 'ip': '127.0.0.1', 'port': 5000 + i}, blocked_node_ids=[])
-    
-    print("[INFO] Waiting for log convergence (4 seconds)...")
-    time.sleep(4)
+    set_partitions(comm, {i: [] for i in range(1, 6)})
     
-    _, _, cluster = get_cluster()
+    print("[INFO] Waiting for log convergence (up to 6 seconds)...")
+    cluster = wait_snapshot(lambda: get_cluster()[2], lambda c: len({v['log'] for v in c.values()}) == 1, timeout=6.0)
     logs = [c['log'] for c in cluster.values()]
     print(f"  Log lengths: {logs}")
     if len(set(logs)) == 1:
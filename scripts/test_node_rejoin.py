@@ -1,39 +1,24 @@
 import sys
 import os
-import time
-import subprocess
-import psutil
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
-from infrastructure.node import Node
-from infrastructure.comms import Communicator
+from _util import peer, wait_until, find_leader, start_node, kill_node, comm as _comm
 
 def get_node_state(nid):
     """Retrieve the current state of a node via gRPC."""
-    node = Node(1)
-    comm = Communicator(node)
-    p = {'id': nid, 'ip': '127.0.0.1', 'port': 5000 + nid}
+    comm = _comm()
+    p = peer(nid)
     res = comm.get_state(p)
     return (res.state, res.term) if res else ("OFFLINE", -1)
 
-def kill_node(nid):
-    """Terminate the process of a specific cluster node."""
-    for proc in psutil.process_iter(['pid', 'cmdline']):
-        try:
-            cmd = proc.info['cmdline']
-            if cmd and 'src/main.py' in ' '.join(cmd) and f'--id {nid}' in ' '.join(cmd):
-                proc.kill()
-                return True
-        except: pass
-    return False
-
 def test_node_rejoin():
     """Test that a failed node successfully synchronizes with the new leader upon restarting."""
     print("[INFO] Locating leader...")
-    l_id = next((i for i in range(1, 6) if get_node_state(i)[0] == 'Leader'), None)
+    # The previous test may have just restarted the leader, so an election can still be running
+    l_id = wait_until(lambda: find_leader(_comm())[0])
     if not l_id:
         print("[FAIL] Cluster has no leader")
         return False
@@ -42,19 +27,18 @@ def test_node_rejoin():
     print(f"[ACTION] Killing leader Node {l_id}...")
     kill_node(l_id)
     print("  Waiting for re-election...")
-    time.sleep(2.0)
+    wait_until(lambda: find_leader(_comm(), exclude=(l_id,))[0])
     
-    new_info = [(i, get_node_state(i)) for i in range(1, 6)]
-    new_l_id = next((i for i, s in new_info if s[0] == 'Leader'), None)
+    new_l_id, _, new_s = find_leader(_comm(), exclude=(l_id,))
     if not new_l_id:
         print("[FAIL] Re-election failed")
         return False
-    new_term = next(s[1] for i, s in new_info if i == new_l_id)
+    new_term = new_s.term
     print(f"  New leader is Node {new_l_id} (term {new_term})")
     
     print(f"[ACTION] Restarting former leader Node {l_id}...")
-    subprocess.Popen([sys.executable, 'src/main.py', '--id', str(l_id)], cwd=project_root)
-    time.sleep(3.0)
+    start_node(l_id)
+    wait_until(lambda: get_node_state(l_id) == ('Follower', new_term))
     
     state, term = get_node_state(l_id)
     print(f"  Node {l_id} state after restart: {state} (term {term})")
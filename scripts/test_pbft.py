@@ -1,47 +1,96 @@
 import sys
 import os
 import time
+import atexit
+import asyncio
+import threading
 import grpc
+import grpc.aio
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, os.path.join(project_root, 'src'))
-sys.path.insert(0, os.path.join(project_root, 'src', 'generated'))
 
 from generated import pbft_pb2
 from generated import pbft_pb2_grpc
 from run_pbft_cluster import start_pbft_cluster, kill_pbft_nodes
+from _util import PBFT_PEERS, wait_until
+
+def _addr(nid):
+    p = PBFT_PEERS[nid - 1]
+    return f"{p['ip']}:{p['port']}"
+
+# GetStatus takes no fields, so every poll sends the same request object
+_STATUS_REQ = pbft_pb2.StatusRequest()
+
+# node_id -> (channel, stub), shared by status polls and client requests
+_clients, _lock = {}, threading.Lock()
+
+def _stub(nid):
+    """Reuse one channel and stub per node across polls and requests."""
+    with _lock:
+        if nid not in _clients:
+            chan = grpc.insecure_channel(_addr(nid))
+            _clients[nid] = (chan, pbft_pb2_grpc.PBFTServiceStub(chan))
+        return _clients[nid][1]
+
+def _drop(nid):
+    """Forget a node's channel after a failure so the next call reconnects right away."""
+    with _lock: entry = _clients.pop(nid, None)
+    if entry: entry[0].close()
+
+# Status polls run on one long-lived event loop over grpc.aio channels (bound to that loop)
+_loop, _aio_channels = asyncio.new_event_loop(), {}
+
+def _astub(nid):
+    if nid not in _aio_channels: _aio_channels[nid] = grpc.aio.insecure_channel(_addr(nid))
+    return pbft_pb2_grpc.PBFTServiceStub(_aio_channels[nid])
+
+async def _adrop(nid):
+    chan = _aio_channels.pop(nid, None)
+    if chan: await chan.close()
+
+@atexit.register
+def _close_all():
+    for nid in list(_clients): _drop(nid)
+    for nid in list(_aio_channels): _loop.run_until_complete(_adrop(nid))
+    _loop.close()
 
 def get_status():
-    """Retrieve current view and primary info from all pBFT nodes."""
-    stats = {}
-    for i in range(1, 5):
+    """Retrieve current view and primary info from all pBFT nodes, multiplexed on one thread."""
+    async def _query(i):
         try:
-            with grpc.insecure_channel(f'127.0.0.1:{6000 + i}') as chan:
-                stub = pbft_pb2_grpc.PBFTServiceStub(chan)
-                s = stub.GetStatus(pbft_pb2.StatusRequest(), timeout=1.0)
-                stats[i] = {'view': s.view, 'primary': s.primary_id, 'is_primary': s.is_primary}
-        except: stats[i] = {'state': 'OFFLINE'}
-    return stats
+            s = await _astub(i).GetStatus(_STATUS_REQ, timeout=1.0)
+            return i, {'view': s.view, 'primary': s.primary_id, 'is_primary': s.is_primary}
+        except:
+            await _adrop(i)
+            return i, {'state': 'OFFLINE'}
+    async def _gather(): return await asyncio.gather(*(_query(i) for i in range(1, 5)))
+    return dict(_loop.run_until_complete(_gather()))
 
 def submit_pbft(nid, op, timeout=8.0):
-    """Send client request to the specified pBFT primary node."""
+    """Send client request to the specified pBFT primary node; a list of operations goes as one batch."""
     try:
-        with grpc.insecure_channel(f'127.0.0.1:{6000 + nid}') as chan:
-            stub = pbft_pb2_grpc.PBFTServiceStub(chan)
-            req = pbft_pb2.ClientRequest(operation=op, timestamp=int(time.time()*1000), client_id=999)
-            return stub.Request(req, timeout=timeout)
+        req = pbft_pb2.ClientRequest(timestamp=int(time.time()*1000), client_id=999)
+        if isinstance(op, str): req.operation = op
+        else: req.operations.extend(op)
+        return _stub(nid).Request(req, timeout=timeout)
     except Exception as e:
+        _drop(nid)
         print(f"  RPC Error: {e}")
         return None
 
+def cluster_ready():
+    """True once all 4 nodes answer and one of them reports itself primary."""
+    stats = get_status()
+    return all('view' in s for s in stats.values()) and any(s.get('is_primary') for s in stats.values())
+
 def test_pbft():
     """Verify pBFT Byzantine Fault Tolerance by testing honest and malicious scenarios."""
     print("[PHASE 1] Consensus with 4 Honest Nodes")
-    kill_pbft_nodes()
-    time.sleep(1)
+    # start_pbft_cluster stops any previous cluster itself
     start_pbft_cluster(4, mal=[])
-    time.sleep(3)
+    wait_until(cluster_ready)
     
     stats = get_status()
     pid = next((nid for nid, s in stats.items() if s.get('is_primary')), None)
@@ -58,11 +107,9 @@ def test_pbft():
         return False
     
     print("\n[PHASE 2] Consensus with 1 Byzantine Node")
-    kill_pbft_nodes()
-    time.sleep(1)
     # Node 4 is malicious
     start_pbft_cluster(4, mal=[4])
-    time.sleep(3)
+    wait_until(cluster_ready)
     
     stats = get_status()
     pid = next((nid for nid, s in stats.items() if s.get('is_primary')), None)
@@ -71,18 +118,10 @@ def test_pbft():
         return False
         
     print(f"  Primary: Node {pid}, Malicious: Node 4. Submitting requests...")
-    successes = 0
-    for i in range(3):
-        res = submit_pbft(pid, f"SET byz_key_{i}=byz_val_{i}")
-        if res and res.success:
-            successes += 1
-            print(f"    Request {i} committed")
-        else:
-            print(f"    Request {i} failed or timed out")
-        time.sleep(0.5)
-            
-    print(f"  Summary: {successes}/3 requests committed")
-    if successes >= 2:
+    # One batched request: a single three-phase round commits all three operations or none of them
+    res = submit_pbft(pid, [f"SET byz_key_{i}=byz_val_{i}" for i in range(3)])
+    print(f"  Batch of 3 operations: {res.result if res else 'no reply (timed out)'}")
+    if res and res.success:
         print("[PASS] pBFT tolerated the Byzantine fault")
         return True
     
@@ -94,4 +133,3 @@ if __name__ == '__main__':
         sys.exit(0 if test_pbft() else 1)
     finally:
         kill_pbft_nodes()
-        time.sleep(1)
@@ -1,60 +1,44 @@
 import sys
 import os
-import time
-import subprocess
-import psutil
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
-from infrastructure.node import Node
-from infrastructure.comms import Communicator
+from _util import peer, port_open, wait_until, wait_committed, find_leader, start_node, kill_node, comm as _comm
 
 def get_node_info(nid):
     """Retrieve state and term for a specific node."""
-    node = Node(1)
-    comm = Communicator(node)
-    p = {'id': nid, 'ip': '127.0.0.1', 'port': 5000 + nid}
+    comm = _comm()
+    p = peer(nid)
     s = comm.get_state(p)
     return p, s
 
 def test_persistence():
     """Verify that a node restores its term and log content from the WAL after a restart."""
     print("[INFO] Submitting data to be persisted...")
-    comm = Communicator(Node(1))
+    comm = _comm()
     # Find leader
-    lid = None
-    for i in range(1, 6):
-        _, s = get_node_info(i)
-        if s and s.state == 'Leader':
-            lid = i
-            break
+    lid = find_leader(comm)[0]
             
     if not lid:
         print("[FAIL] No leader to submit data to")
         return False
         
     lp, ls = get_node_info(lid)
-    for i in range(3):
-        comm.submit_command(lp, f"SET PersistentKey{i}=Value{i}")
+    comm.submit_commands(lp, [f"SET PersistentKey{i}=Value{i}" for i in range(3)])
     
-    time.sleep(2)
+    # Wait for the leader to commit what it appended rather than sleeping
+    wait_committed(comm, get_node_info(lid)[1].log_length, ids=(lid,))
     _, s_before = get_node_info(lid)
     print(f"  State before crash: term={s_before.term}, log_len={s_before.log_length}")
     
     print(f"[ACTION] Killing leader Node {lid} to test persistence...")
-    for proc in psutil.process_iter(['pid', 'cmdline']):
-        try:
-            cmd = proc.info['cmdline']
-            if cmd and 'src/main.py' in ' '.join(cmd) and f'--id {lid}' in ' '.join(cmd):
-                proc.kill()
-        except: pass
-        
-    time.sleep(1)
+    kill_node(lid)
+    wait_until(lambda: not port_open(lp['port']), timeout=1.0)
     print(f"[ACTION] Restarting Node {lid}...")
-    subprocess.Popen([sys.executable, 'src/main.py', '--id', str(lid)], cwd=project_root)
-    time.sleep(3)
+    start_node(lid)
+    wait_until(lambda: (s := get_node_info(lid)[1]) and s.log_length >= s_before.log_length, timeout=3.0)
     
     _, s_after = get_node_info(lid)
     if not s_after:
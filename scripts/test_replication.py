@@ -1,24 +1,18 @@
 import sys
 import os
-import time
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
-from infrastructure.node import Node
-from infrastructure.comms import Communicator
+from _util import base_port, snapshot, read_key, wait_until, wait_snapshot, comm as _comm
+
+BASE_PORT = base_port()
 
 def get_cluster():
     """Returns a communicator and the current state of all nodes in the cluster."""
-    node = Node(1)
-    comm = Communicator(node)
-    cluster = {}
-    for pid in range(1, 6):
-        p = {'id': pid, 'ip': '127.0.0.1', 'port': 5000 + pid}
-        s = comm.get_state(p)
-        if s: cluster[pid] = {'info': p, 'state': s.state, 'log': s.log_length}
-    return node, comm, cluster
+    comm = _comm(BASE_PORT)
+    return comm.node, comm, snapshot(comm, BASE_PORT)
 
 def test_replication():
     """Verify that commands submitted to the leader are replicated to all followers."""
@@ -32,29 +26,35 @@ def test_replication():
     
     print(f"[INFO] Leader is Node {leader['info']['id']}. Submitting commands...")
     commands = ["SET X=100", "SET Y=200", "SET Z=300"]
-    for cmd in commands:
-        res = comm.submit_command(leader['info'], cmd)
-        if not res or not res.success:
-            print(f"[FAIL] Failed to submit command '{cmd}'")
-            return False
-        print(f"  Command accepted: {cmd}")
-    
-    print("[INFO] Waiting for log replication (2 seconds)...")
-    time.sleep(2.0)
+    # One RPC (and one WAL write on the leader) for the whole batch
+    res = comm.submit_commands(leader['info'], commands)
+    if not res or not res.success:
+        print(f"[FAIL] Failed to submit commands {commands}")
+        return False
+    print("\n".join(f"  Command accepted: {cmd}" for cmd in commands))
     
-    _, _, cluster = get_cluster()
-    print("\nReplication Status:")
+    print("[INFO] Waiting for log replication...")
+    # The wait's final snapshot doubles as the status table, so the cluster isn't polled again
+    target = leader['log'] + len(commands)
+    cluster = wait_snapshot(lambda: get_cluster()[2],
+                            lambda c: len(c) == 5 and all(v['commit'] >= target for v in c.values()), timeout=2.0)
+    # Emit the whole table in one write
+    print("\nReplication Status:\n" + "\n".join(f"  Node {nid}: {c['state']:10s} | Log Length: {c['log']}"
+                                              for nid, c in sorted(cluster.items())), flush=True)
     for nid, c in sorted(cluster.items()):
-        print(f"  Node {nid}: {c['state']:10s} | Log Length: {c['log']}")
         if c['log'] < 3:
             print(f"[FAIL] Node {nid} has incomplete log (expected >= 3)")
             return False
             
     print("\n[INFO] Verifying data consistency across cluster...")
-    for nid, c in sorted(cluster.items()):
-        data = comm.get_data(c['info'], 'Y')
-        val = data.value if data and data.success else "NOT FOUND"
-        print(f"  Node {nid}: Y = {val}")
+    def read_values():
+        values = read_key(comm, 'Y', BASE_PORT, ids=sorted(cluster))
+        return {nid: v if v is not None else "NOT FOUND" for nid, v in values.items()}
+    # Committed entries reach the state machine on the next apply tick (~10ms)
+    wait_until(lambda: all(v == '200' for v in read_values().values()), timeout=1.0)
+    values = read_values()
+    print("\n".join(f"  Node {nid}: Y = {val}" for nid, val in values.items()), flush=True)
+    for nid, val in values.items():
         if val != '200':
             print(f"[FAIL] Data inconsistency on Node {nid}")
             return False
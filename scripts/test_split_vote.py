@@ -1,34 +1,23 @@
 import sys
 import os
-import time
-import subprocess
-import psutil
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
-from infrastructure.node import Node
-from infrastructure.comms import Communicator
+from _util import PEERS, snapshot, port_open, wait_until, watch_states, start_node, kill_nodes, comm as _comm
 
 def get_cluster_state():
     """Returns the current state of all nodes that are reachable."""
-    temp_node = Node(1)
-    comm = Communicator(temp_node)
-    states = {}
-    for i in range(1, 6):
-        peer = {'id': i, 'ip': '127.0.0.1', 'port': 5000 + i}
-        res = comm.get_state(peer)
-        if res: states[i] = res.state
-    return states
+    return {i: n['state'] for i, n in snapshot(_comm()).items()}
+
+def resolved(states):
+    """True once all 5 nodes have reported and exactly one of them is Leader."""
+    return len(states) == 5 and [s.state for s in states.values()].count('Leader') == 1
 
 def kill_all():
     """Terminate all Raft node processes."""
-    for proc in psutil.process_iter(['pid', 'cmdline']):
-        try:
-            cmd = proc.info['cmdline']
-            if cmd and 'src/main.py' in ' '.join(cmd): proc.kill()
-        except: pass
+    kill_nodes(range(1, 6))
 
 def test_split_vote():
     """Stress test election resolution by restarting the entire cluster multiple times."""
@@ -36,16 +25,16 @@ def test_split_vote():
     for iter_idx in range(1, 3):
         print(f"\n--- Iteration {iter_idx}: Rapid Cluster Restart ---")
         kill_all()
-        time.sleep(1)
+        wait_until(lambda: not any(port_open(p['port']) for p in PEERS), timeout=1.0)
         
         print("  Launching all nodes simultaneously...")
         for i in range(1, 6):
-            subprocess.Popen([sys.executable, 'src/main.py', '--id', str(i)], cwd=project_root)
-        
-        print("  Waiting for election resolution (3 seconds)...")
-        time.sleep(3.0)
+            start_node(i)
         
-        states = get_cluster_state()
+        print("  Waiting for election resolution (up to 3 seconds)...")
+        # Nodes push their state as it changes, so resolution is seen as soon as it happens
+        streamed = watch_states(_comm(), resolved, timeout=3.0)
+        states = {i: s.state for i, s in streamed.items()} if streamed else get_cluster_state()
         leaders = [nid for nid, st in states.items() if st == 'Leader']
         print(f"  Nodes Online: {len(states)}, Leaders: {len(leaders)} {leaders}")
         
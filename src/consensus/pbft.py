@@ -1,9 +1,47 @@
 import threading
+import queue
 import time
 import hashlib
-from collections import defaultdict
+import json
+import functools
+from collections import defaultdict, deque
 from generated import pbft_pb2
 from consensus.state_machine import StateMachine
+from infrastructure.comms import Communicator
+
+@functools.lru_cache(maxsize=4096)
+def _sha256(payload):
+    """
+    Raw SHA-256 of a payload; the primary and retried requests hash the same text only once.
+    hashlib drops the GIL while hashing large inputs, so handler threads hash concurrently.
+    """
+    return hashlib.sha256(payload.encode()).digest()
+
+# Phase replies carry nothing but the verdict, so each is built once and shared (gRPC only serializes them)
+_PRE_PREPARE_OK, _PRE_PREPARE_NO = pbft_pb2.PrePrepareReply(accepted=True), pbft_pb2.PrePrepareReply(accepted=False)
+_PREPARE_OK, _PREPARE_NO = pbft_pb2.PrepareReply(accepted=True), pbft_pb2.PrepareReply(accepted=False)
+_COMMIT_OK, _COMMIT_NO = pbft_pb2.CommitReply(accepted=True), pbft_pb2.CommitReply(accepted=False)
+_VIEW_CHANGE_OK, _VIEW_CHANGE_NO = pbft_pb2.ViewChangeReply(accepted=True), pbft_pb2.ViewChangeReply(accepted=False)
+# Broadcast message type -> PBFTService method
+_PHASE_RPCS = {'pre_prepare': 'PrePrepare', 'prepare': 'Prepare', 'commit': 'Commit', 'view_change': 'ViewChange'}
+
+def _popcount(mask):
+    """Number of replicas recorded in a vote bitmask."""
+    return bin(mask).count('1')
+
+# Executed (view, seq) keys remembered to drop late votes; older ones are forgotten
+_EXECUTED_WINDOW = 4096
+# Vote-counting threads; a power of two so a sequence's worker is just the low bits of the sequence
+_VOTE_WORKERS = 4
+# Slots in the vote ring; sequences this far apart never share a slot while both are in flight.
+# A multiple of _VOTE_WORKERS, so each slot is only ever touched by one worker.
+_WINDOW = 1024
+
+class _Pending:
+    """A client request waiting on the primary for its batch's reply, or for a batch to propose."""
+    __slots__ = ('req', 'done', 'reply', 'batch')
+    def __init__(self, req):
+        self.req, self.done, self.reply, self.batch = req, threading.Event(), None, None
 
 class PBFTConsensus:
     """
@@ -11,96 +49,254 @@ class PBFTConsensus:
     Tolerates up to f Byzantine nodes in a cluster of 3f+1 total nodes.
     """
     
-    def __init__(self, node, f=1):
+    def __init__(self, node, f=1, max_batch=64, max_inflight=4):
         self.node = node
         self.f = f
+        self.max_batch = max_batch
+        self.max_inflight = max_inflight
         self.quorum = 2 * f + 1
-        self.view = 0
+        self.n = len(node.peers) + 1
+        self._enter_view(0)
         self.sequence = 0
         self.state_machine = StateMachine(node=node)
         
         self.pre_prepares = {}
-        self.prepares = defaultdict(set)
-        self.commits = defaultdict(set)
+        # Votes are bitmasks with bit i set once replica i has voted
+        # Prepare/commit votes live in a ring indexed by seq & (_WINDOW - 1), stored as parallel
+        # arrays: the (view, seq) owning each slot and its {digest: bitmask} of votes
+        self._slot_view = [None] * _WINDOW
+        self._slot_seq = [None] * _WINDOW
+        self._prepares = [None] * _WINDOW
+        self._commits = [None] * _WINDOW
+        # Entries are removed once their sequence executes; executed keeps the last _EXECUTED_WINDOW keys
         self.executed = set()
-        self.pending_requests = {}
-        self.view_change_votes = defaultdict(set)
+        self._executed_order = deque()
+        # (view, seq) -> Event the primary's proposing thread waits on until that sequence executes
+        self._commit_events = {}
+        self.view_change_votes = defaultdict(int)
         
         self.state = "normal"
         self.view_change_timeout = 10.0
-        self.last_activity = time.time()
-        self.lock = threading.RLock()
+        self.last_activity = time.monotonic()
+        # Guards view, sequence, pre_prepares, executed and the state machine
+        self.lock = threading.Lock()
+        # Handlers hand prepare/commit votes to the worker owning their sequence and return at once.
+        # Each worker alone touches its sequences' vote slots, so counting needs no lock.
+        # The queues outlive the workers: votes that arrive before start() wait for them.
+        self._vote_queues = [queue.SimpleQueue() for _ in range(_VOTE_WORKERS)]
+        self._vote_threads = []
         self.running = False
+        self._stopped = threading.Event()
         self.malicious = False
+        # One Communicator for the node's lifetime, so broadcasts reuse its per-peer channels
+        self._comm = Communicator(node)
+        # Client requests that arrive while max_inflight rounds are running wait here and go out as one batch
+        self._batch = []
+        self._batch_lock = threading.Lock()
+        self._inflight = 0
+    
+    def _enter_view(self, view):
+        """Switch to `view`; the primary for it is worked out here once, not on every message."""
+        self.view = view
+        self.primary_id = view % self.n + 1
+        self.is_primary = self.node.node_id == self.primary_id
     
-    @property
-    def primary_id(self):
-        return (self.view % (len(self.node.peers) + 1)) + 1
+    @staticmethod
+    def _operations(request):
+        """Operations carried by a client request: its batch, or the single operation."""
+        return list(request.operations) or [request.operation]
     
-    @property
-    def is_primary(self):
-        return self.node.node_id == self.primary_id
+    def _request_digest(self, request):
+        """
+        Digest of a request's operations, encoded as a JSON list. Joining them with newlines
+        would let one operation containing a newline hash the same as a batch of two.
+        """
+        return self._digest(json.dumps(self._operations(request)))
+    
+    @staticmethod
+    def _ambiguous(request):
+        """A request setting both operation and operations; which one runs would be up to the replica."""
+        return bool(request.operation and request.operations)
     
     def _digest(self, msg):
-        """SHA-256 digest. Malicious nodes return garbage."""
-        if self.malicious: return hashlib.sha256(b"malicious").hexdigest()
-        return hashlib.sha256(msg.encode()).hexdigest()
+        """
+        SHA-256 digest. Malicious nodes return garbage.
+        Only the primary and the PrePrepare check hash; Prepare and Commit compare digests.
+        The hash must stay collision-resistant, or a faulty primary could pair one digest
+        with two different requests, so a fast non-cryptographic hash won't do here.
+        """
+        if self.malicious: return hashlib.sha256(b"malicious").digest()
+        return _sha256(msg)
+    
+    def _is_replica(self, rid):
+        """True for a cluster member's id; anything else would be an unbounded shift into a vote mask."""
+        return 0 < rid <= self.n
+    
+    def _mark_executed(self, key):
+        """Record (view, seq) as executed, forgetting the oldest key beyond the window."""
+        self.executed.add(key)
+        self._executed_order.append(key)
+        if len(self._executed_order) > _EXECUTED_WINDOW: self.executed.discard(self._executed_order.popleft())
+    
+    def _slot(self, v, n):
+        """
+        Ring index holding (v, n)'s votes, claiming and clearing the slot if it belonged
+        to another sequence; None for a vote from an older view than the one using n's slot.
+        Only called from n's vote worker.
+        """
+        i = n & (_WINDOW - 1)
+        if self._slot_seq[i] == n:
+            if self._slot_view[i] == v: return i
+            if self._slot_view[i] > v: return None
+        self._slot_view[i], self._slot_seq[i] = v, n
+        self._prepares[i], self._commits[i] = {}, {}
+        return i
+    
+    @staticmethod
+    def _vote(votes, d, rid):
+        """Add replica rid's vote for digest d to a slot's {digest: bitmask}; returns the updated mask."""
+        mask = votes[d] = votes.get(d, 0) | 1 << rid
+        return mask
+    
+    def _enqueue(self, kind, v, n, d, rid):
+        """Queue a 'prepare' or 'commit' vote for the worker that owns sequence n."""
+        self._vote_queues[n & (_VOTE_WORKERS - 1)].put((kind, v, n, d, rid))
+    
+    def _vote_loop(self, q):
+        """Count the votes queued for one worker's sequences until stop()."""
+        while True:
+            item = q.get()
+            if item is None: return
+            kind, v, n, d, rid = item
+            try:
+                if kind == 'prepare': self._on_prepare(v, n, d, rid)
+                else: self._on_commit(v, n, d, rid)
+            except Exception as e:
+                self.node.log(f"Vote handling failed for seq {n}: {e}", level="ERROR")
     
     def start(self):
         self.running = True
+        self._stopped.clear()
+        if not self._vote_threads:
+            self._vote_threads = [threading.Thread(target=self._vote_loop, args=(q,), daemon=True) for q in self._vote_queues]
+            for t in self._vote_threads: t.start()
         threading.Thread(target=self._timeout_loop, daemon=True).start()
         self.node.log(f"pBFT started: view={self.view}, primary=Node {self.primary_id}")
     
     def stop(self):
         self.running = False
+        self._stopped.set()
+        # Sentinels only for running workers, so a later start() doesn't find stale ones queued
+        if self._vote_threads:
+            for q in self._vote_queues: q.put(None)
+            for t in self._vote_threads: t.join(timeout=1.0)
+        self._vote_threads = []
     
     def _timeout_loop(self):
+        """
+        Start a view change once the primary has been silent for view_change_timeout.
+        Sleeps until that deadline rather than polling; traffic only pushes the deadline
+        later, so waking at the old one and re-checking is enough.
+        """
         while self.running:
-            time.sleep(1.0)
+            remaining = self.last_activity + self.view_change_timeout - time.monotonic()
+            if remaining > 0:
+                self._stopped.wait(remaining)
+                continue
             if self.state == "normal" and not self.is_primary:
-                if time.time() - self.last_activity > self.view_change_timeout:
-                    self.node.log("Primary timeout, starting view change", level="WARN")
-                    self._initiate_view_change()
+                self.node.log("Primary timeout, starting view change", level="WARN")
+                self._initiate_view_change()
+            # Primary, or already changing view: nothing to do until another full period passes
+            self._stopped.wait(self.view_change_timeout)
     
     def _initiate_view_change(self):
         with self.lock:
             self.state = "view-change"
             new_v = self.view + 1
-            self.view_change_votes[new_v].add(self.node.node_id)
+            self.view_change_votes[new_v] |= 1 << self.node.node_id
         req = pbft_pb2.ViewChangeRequest(new_view=new_v, last_sequence=self.sequence, 
                                           replica_id=self.node.node_id)
         self._broadcast('view_change', req)
     
     def _broadcast(self, msg_type, req):
-        """Broadcast message to all peers."""
-        from infrastructure.comms import Communicator
-        comm = Communicator(self.node)
-        for peer in self.node.peers:
-            try:
-                if msg_type == 'pre_prepare': comm.pbft_pre_prepare(peer, req, timeout=0.5)
-                elif msg_type == 'prepare': comm.pbft_prepare(peer, req, timeout=0.5)
-                elif msg_type == 'commit': comm.pbft_commit(peer, req, timeout=0.5)
-                elif msg_type == 'view_change': comm.pbft_view_change(peer, req, timeout=0.5)
-            except: pass
+        """
+        Send message to all peers without waiting on their replies. Each send is an
+        in-flight gRPC future, so a slow peer delays only its own copy of the message.
+        The message is serialized once and the same bytes go to every peer.
+        """
+        method, payload = _PHASE_RPCS[msg_type], req.SerializeToString()
+        for peer in self.node.peers: self._comm.pbft_cast(peer, method, payload, timeout=0.5)
     
     def handle_client_request(self, req):
+        """
+        Primary: run consensus on the request, or queue it behind the rounds in flight.
+        At most max_inflight PrePrepares are outstanding, so a burst can't flood replicas.
+        Rounds within that window overlap; a window of 1 runs them strictly one after another,
+        trading throughput for the largest batches.
+        Requests arriving at the limit are merged into the next PrePrepare (up to max_batch),
+        which a finishing proposer hands to the first queued thread. Every request in a
+        batch gets that batch's reply.
+        """
+        with self.lock:
+            self.last_activity = time.monotonic()
+            if not self.is_primary:
+                return pbft_pb2.ClientReply(view=self.view, success=False, 
+                    result=f"Redirect to Node {self.primary_id}")
+        if self._ambiguous(req):
+            return pbft_pb2.ClientReply(view=self.view, success=False, result="Set operation or operations, not both")
+        
+        slot = _Pending(req)
+        with self._batch_lock:
+            if self._inflight < self.max_inflight:
+                self._inflight += 1
+                slot.batch = [slot]
+            else: self._batch.append(slot)
+        if slot.batch is None:
+            slot.done.wait()
+            # Woken with a batch rather than a reply: a finishing proposer handed this thread its slot
+            if slot.batch is None: return slot.reply
+        
+        batch = slot.batch
+        if len(batch) == 1: merged = batch[0].req
+        else: merged = pbft_pb2.ClientRequest(
+            operations=[op for p in batch for op in self._operations(p.req)],
+            timestamp=batch[0].req.timestamp, client_id=batch[0].req.client_id)
+        try: reply = self._propose(merged)
+        except Exception as e:
+            # Never leave the batch (or the queue behind it) waiting on a failed round
+            reply = pbft_pb2.ClientReply(view=self.view, success=False, result=f"Error: {e}")
+        for p in batch:
+            p.reply = reply
+            p.done.set()
+        
+        with self._batch_lock:
+            if self._batch:
+                nxt, self._batch = self._batch[:self.max_batch], self._batch[self.max_batch:]
+                nxt[0].batch = nxt
+                nxt[0].done.set()
+            else: self._inflight -= 1
+        return reply
+    
+    def _propose(self, req):
         """Primary: assign sequence number and initiate consensus."""
+        # Hash before taking the lock so other handlers aren't held up by it
+        digest = self._request_digest(req)
         with self.lock:
-            self.last_activity = time.time()
+            self.last_activity = time.monotonic()
             if not self.is_primary:
                 return pbft_pb2.ClientReply(view=self.view, success=False, 
                     result=f"Redirect to Node {self.primary_id}")
             
             self.sequence += 1
             seq = self.sequence
-            digest = self._digest(req.operation)
-            self.pending_requests[digest] = req
             
             pp = pbft_pb2.PrePrepareRequest(view=self.view, sequence=seq, digest=digest, 
                                            request=req, primary_id=self.node.node_id)
             self.pre_prepares[(self.view, seq)] = pp
-            # Primary counts itself
-            self.prepares[(self.view, seq, digest)].add(self.node.node_id)
+            view = self.view
+            done = self._commit_events[(view, seq)] = threading.Event()
+        # Primary counts itself
+        self._enqueue('prepare', view, seq, digest, self.node.node_id)
         
         # Broadcast PrePrepare (outside lock)
         self._broadcast('pre_prepare', pp)
@@ -109,98 +305,97 @@ class PBFTConsensus:
         self._broadcast('prepare', pbft_pb2.PrepareRequest(
             view=self.view, sequence=seq, digest=digest, replica_id=self.node.node_id))
         
-        # Wait for execution
-        for _ in range(80):
-            time.sleep(0.1)
-            with self.lock:
-                if (self.view, seq) in self.executed:
-                    return pbft_pb2.ClientReply(view=self.view, success=True, 
-                        result=f"Committed seq {seq}")
-        
+        # Wait for execution; handle_commit sets the event
+        if done.wait(timeout=8.0):
+            return pbft_pb2.ClientReply(view=view, success=True, result=f"Committed seq {seq}")
+        with self.lock: self._commit_events.pop((view, seq), None)
         return pbft_pb2.ClientReply(view=self.view, success=False, result="Timeout")
     
     def handle_pre_prepare(self, req):
         """Validate PrePrepare from primary and broadcast Prepare."""
         v, n, d = req.view, req.sequence, req.digest
+        if self._ambiguous(req.request) or d != self._request_digest(req.request):
+            self.node.log(f"Digest mismatch seq {n}", level="WARN")
+            return _PRE_PREPARE_NO
         
         with self.lock:
-            self.last_activity = time.time()
-            
-            if v != self.view or req.primary_id != self.primary_id:
-                return pbft_pb2.PrePrepareReply(accepted=False)
+            self.last_activity = time.monotonic()
             
-            expected = self._digest(req.request.operation)
-            if d != expected:
-                self.node.log(f"Digest mismatch seq {n}", level="WARN")
-                return pbft_pb2.PrePrepareReply(accepted=False)
+            if v != self.view or req.primary_id != self.primary_id or (v, n) in self.executed:
+                return _PRE_PREPARE_NO
             
             self.pre_prepares[(v, n)] = req
-            self.pending_requests[d] = req.request
-            self.prepares[(v, n, d)].add(self.node.node_id)
+        self._enqueue('prepare', v, n, d, self.node.node_id)
         
         # Broadcast Prepare (outside lock)
         self._broadcast('prepare', pbft_pb2.PrepareRequest(
             view=v, sequence=n, digest=d, replica_id=self.node.node_id))
         
-        return pbft_pb2.PrePrepareReply(accepted=True)
+        return _PRE_PREPARE_OK
     
     def handle_prepare(self, req):
-        """Collect Prepare votes. Start Commit phase when quorum reached."""
-        v, n, d = req.view, req.sequence, req.digest
-        should_commit = False
-        
-        with self.lock:
-            self.last_activity = time.time()
-            if v != self.view:
-                return pbft_pb2.PrepareReply(accepted=False)
-            
-            self.prepares[(v, n, d)].add(req.replica_id)
-            count = len(self.prepares[(v, n, d)])
-            
-            if count >= self.quorum and self.node.node_id not in self.commits[(v, n, d)]:
-                self.commits[(v, n, d)].add(self.node.node_id)
-                should_commit = True
-        
-        if should_commit:
-            self._broadcast('commit', pbft_pb2.CommitRequest(
-                view=v, sequence=n, digest=d, replica_id=self.node.node_id))
+        """Accept a Prepare vote for counting by its sequence's worker."""
+        # A stale view read only rejects or accepts a vote a moment early; votes are keyed by view
+        self.last_activity = time.monotonic()
+        if req.view != self.view or not self._is_replica(req.replica_id): return _PREPARE_NO
+        self._enqueue('prepare', req.view, req.sequence, req.digest, req.replica_id)
+        return _PREPARE_OK
+    
+    def _on_prepare(self, v, n, d, rid):
+        """Count a Prepare vote. Start Commit phase when quorum reached."""
+        # Late vote for a sequence that already executed and was cleared, or from a view we have left
+        if (v, n) in self.executed or v != self.view: return
+        i = self._slot(v, n)
+        if i is None: return
+        count = _popcount(self._vote(self._prepares[i], d, rid))
+        if count < self.quorum or self._commits[i].get(d, 0) >> self.node.node_id & 1: return
         
-        return pbft_pb2.PrepareReply(accepted=True)
+        self._vote(self._commits[i], d, self.node.node_id)
+        self._broadcast('commit', pbft_pb2.CommitRequest(
+            view=v, sequence=n, digest=d, replica_id=self.node.node_id))
     
     def handle_commit(self, req):
-        """Collect Commit votes. Execute when quorum reached."""
-        v, n, d = req.view, req.sequence, req.digest
+        """Accept a Commit vote for counting by its sequence's worker."""
+        self.last_activity = time.monotonic()
+        if req.view != self.view or not self._is_replica(req.replica_id): return _COMMIT_NO
+        self._enqueue('commit', req.view, req.sequence, req.digest, req.replica_id)
+        return _COMMIT_OK
+    
+    def _on_commit(self, v, n, d, rid):
+        """Count a Commit vote. Execute when quorum reached."""
+        if (v, n) in self.executed or v != self.view: return
+        i = self._slot(v, n)
+        if i is None or _popcount(self._vote(self._commits[i], d, rid)) < self.quorum: return
         
         with self.lock:
-            self.last_activity = time.time()
-            if v != self.view:
-                return pbft_pb2.CommitReply(accepted=False)
-            
-            self.commits[(v, n, d)].add(req.replica_id)
-            
-            if len(self.commits[(v, n, d)]) >= self.quorum and (v, n) not in self.executed:
-                self.executed.add((v, n))
-                request = self.pending_requests.get(d)
-                if request:
-                    _, res = self.state_machine.apply(request.operation)
-                    self.node.log(f"COMMIT seq={n}: {request.operation} -> {res}")
-        
-        return pbft_pb2.CommitReply(accepted=True)
+            self._mark_executed((v, n))
+            waiter = self._commit_events.pop((v, n), None)
+            pp = self.pre_prepares.pop((v, n), None)
+            applied = []
+            if pp and pp.digest == d:
+                applied = [(op, self.state_machine.apply(op)[1]) for op in self._operations(pp.request)]
+        # Votes are no longer needed; executed now turns away any that arrive late
+        self._slot_seq[i] = self._prepares[i] = self._commits[i] = None
+        # Logging and waking the proposer don't need the lock
+        for op, res in applied: self.node.log(f"COMMIT seq={n}: {op} -> {res}")
+        if waiter: waiter.set()
     
     def handle_view_change(self, req):
+        changed = False
         with self.lock:
-            if req.new_view <= self.view:
-                return pbft_pb2.ViewChangeReply(accepted=False)
+            if req.new_view <= self.view or not self._is_replica(req.replica_id):
+                return _VIEW_CHANGE_NO
             
-            self.view_change_votes[req.new_view].add(req.replica_id)
+            self.view_change_votes[req.new_view] |= 1 << req.replica_id
             
-            if len(self.view_change_votes[req.new_view]) >= self.quorum:
-                self.view = req.new_view
+            if _popcount(self.view_change_votes[req.new_view]) >= self.quorum:
+                self._enter_view(req.new_view)
                 self.state = "normal"
-                self.last_activity = time.time()
-                self.node.log(f"View change complete: view={self.view}")
+                self.last_activity = time.monotonic()
+                changed = True
+        if changed: self.node.log(f"View change complete: view={req.new_view}")
         
-        return pbft_pb2.ViewChangeReply(accepted=True)
+        return _VIEW_CHANGE_OK
     
     def get_status(self):
         with self.lock:
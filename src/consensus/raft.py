@@ -1,6 +1,8 @@
 import threading
 import time
+import json
 import random
+from array import array
 from generated import raft_pb2
 from consensus.state_machine import StateMachine
 from storage.wal import WAL
@@ -12,42 +14,173 @@ class RaftConsensus:
     
     def __init__(self, node):
         self.node = node
-        self.wal = WAL(node.node_id)
+        # The node's Communicator, so RPCs reuse its per-peer channels
+        self._comm = node.comm
+        self.wal = WAL(node.node_id, node.data_dir)
         self.state_machine = StateMachine(node=node)
         
-        saved_term, saved_voted_for, saved_log = self.wal.load()
+        saved_term, saved_voted_for, saved_snapshot, saved_terms, saved_commands = self.wal.load()
         self.current_term = saved_term
         self.voted_for = saved_voted_for
-        self.log = saved_log
+        # Entries up to snapshot_index exist only as the state machine snapshot (_snapshot_data)
+        self.snapshot_index, self.snapshot_term, self._snapshot_data = saved_snapshot or (0, 0, None)
+        if self._snapshot_data is not None: self.state_machine.restore(self._snapshot_data)
+        # Once last_applied is this far past the snapshot, a new one is taken
+        self.snapshot_every = node.snapshot_every
+        # Log kept as parallel columns: terms[i] and commands[i] describe entry snapshot_index+i+1
+        self.terms = array('q', saved_terms)
+        self.commands = saved_commands
+        # The same entries as ready-made protobuf messages, built once at append time for AppendEntries
+        self._entry_pb = [raft_pb2.Entry(term=t, command=c) for t, c in zip(saved_terms, saved_commands)]
+        # Entries known to be on disk (a prefix of the log); _log_gen bumps whenever the log is truncated
+        self._persisted_len = self.snapshot_index + len(self.terms)
+        self._log_gen = 0
+        self._wal_stale = False
+        # Snapshot index the WAL currently holds; the persister rewrites it when snapshot_index moves on
+        self._wal_base = self.snapshot_index
         
         self.state = 'Follower'
-        self.commit_index = 0
-        self.last_applied = 0
-        self.last_heartbeat = time.time()
-        self.election_timeout = self._random_timeout()
+        self.commit_index = self.snapshot_index
+        self.last_applied = self.snapshot_index
+        # Last AppendEntries from a current leader; while recent, pre-votes are refused
+        self.last_append = 0.0
+        # Smoothed AppendEntries round trip: measured by the leader, copied from it by followers
+        self.rtt_ewma = 0.02
+        # Timeouts are drawn from the OS entropy pool, so nodes started together never share a seed
+        self._rng = random.SystemRandom()
+        # All election timing is on the monotonic clock, so wall-clock jumps cannot trigger an election
+        self._reset_election_timer()
+        # We stood for election in the saved term, most likely winning it: after a restart, try again at once
+        if self.voted_for == node.node_id: self.election_deadline = 0.0
         
         self.next_index = {}
         self.match_index = {}
+        # Most entries sent to a follower in one AppendEntries; a lagging follower catches up over several rounds
+        self.max_batch = 64
+        # Longest an RPC handler waits on the persister; while WAL writes keep failing, handlers reply failure instead of piling up
+        self.persist_timeout = 1.0
+        # Set by submit_command so the leader replicates new entries now rather than at the next heartbeat
+        self._replicate = threading.Event()
+        # Followers currently being sent an InstallSnapshot
+        self._installing = set()
+        # Leader lease: until when each follower's latest ack vouches for us (monotonic), and until when a majority does
+        self._ack_until = {}
+        self.leader_lease_expiry = 0.0
         
         self.lock = threading.Lock()
+        # Both share self.lock: apply_cv is notified when commit_index rises, election_cv on stop
+        self.apply_cv = threading.Condition(self.lock)
+        self.election_cv = threading.Condition(self.lock)
+        # Group commit: persist_cv wakes the persister thread, persisted_cv wakes writers waiting on it
+        self.persist_cv = threading.Condition(self.lock)
+        self.persisted_cv = threading.Condition(self.lock)
+        # Own lock, taken inside self.lock: notified each time _publish_state replaces the snapshot
+        self.state_cv = threading.Condition()
         self.running = False
         self.election_thread = None
         self.heartbeat_thread = None
         self.apply_thread = None
+        self.persist_thread = None
+        self._publish_state()
         
+    def _publish_state(self):
+        """Replace the monitoring snapshot returned by get_state; caller holds self.lock (or is __init__)."""
+        self._state_snapshot = {
+            'state': self.state, 
+            'term': self.current_term, 
+            'voted_for': self.voted_for, 
+            'log_length': self._last_log_index(), 
+            'commit_index': self.commit_index, 
+            'last_applied': self.last_applied
+        }
+        self.notify_state_waiters()
+    
+    def notify_state_waiters(self):
+        """Wake every wait_state_change caller so it re-checks its condition."""
+        with self.state_cv: self.state_cv.notify_all()
+    
+    def wait_state_change(self, seen, cancelled):
+        """Block until get_state() would return something other than `seen`, or cancelled() is true; returns the current state."""
+        with self.state_cv:
+            self.state_cv.wait_for(lambda: self._state_snapshot is not seen or cancelled())
+            return self._state_snapshot
+    
+    def _timeout_base(self, rtt=None):
+        """Shortest election timeout: 15 x smoothed RTT (or the given one), clamped to 300ms..2s."""
+        return max(0.3, min(2.0, 15 * (self.rtt_ewma if rtt is None else rtt)))
+    
     def _random_timeout(self):
-        """Generate a random election timeout between 300ms and 600ms."""
-        return random.uniform(0.3, 0.6)
+        """Generate a random election timeout in [T, 2T), T = _timeout_base()."""
+        base = self._timeout_base()
+        return self._rng.uniform(base, 2 * base)
+    
+    def _reset_election_timer(self):
+        """Restart the election timeout from now with a fresh random duration."""
+        self.last_heartbeat = time.monotonic()
+        self.election_timeout = self._random_timeout()
+        self.election_deadline = self.last_heartbeat + self.election_timeout
     
     def _persist(self):
-        """Persist current state to WAL."""
-        self.wal.save(self.current_term, self.voted_for, self.log)
+        """Persist current term and vote to the WAL (log entries go through the persister thread). False on failure."""
+        if self.wal.save_meta(self.current_term, self.voted_for): return True
+        self.node.log(f"Failed to save term {self.current_term} and vote to the WAL", level="ERROR")
+        return False
+    
+    def _term_at(self, k):
+        """Term of entry k, for snapshot_index <= k <= last log index."""
+        return self.terms[k - self.snapshot_index - 1] if k > self.snapshot_index else self.snapshot_term
+    
+    def _truncate_log(self, k):
+        """Drop every entry after index k (k >= snapshot_index); the persister cuts the WAL back to match."""
+        lo = k - self.snapshot_index
+        del self.terms[lo:], self.commands[lo:], self._entry_pb[lo:]
+        self._log_gen += 1
+        self._persisted_len = min(self._persisted_len, k)
+        self._wal_stale = True
+        self.persist_cv.notify()
+    
+    def _wait_persisted(self, n):
+        """
+        Block (releasing self.lock) until the first n entries are on disk. False if the log was
+        truncated, we stopped, or persist_timeout passed meanwhile.
+        """
+        gen = self._log_gen
+        self.persisted_cv.wait_for(lambda: not self.running or self._persisted_len >= n or self._log_gen != gen, self.persist_timeout)
+        return self._log_gen == gen and self._persisted_len >= n
+    
+    def _run_persister(self):
+        """Group commit: write every log change since the last pass with one WAL append and fsync."""
+        while True:
+            with self.lock:
+                self.persist_cv.wait_for(lambda: not self.running or self._wal_stale or self._wal_base != self.snapshot_index
+                                         or self._persisted_len < self._last_log_index())
+                if not self.running: return
+                gen, base = self._log_gen, self.snapshot_index
+                # A new snapshot rewrites the log file from scratch; otherwise only what changed is appended
+                snap = (base, self.snapshot_term, self._snapshot_data) if self._wal_base != base else None
+                start = base if snap else self._persisted_len
+                terms, commands = self.terms[start - base:], self.commands[start - base:]
+                self._wal_stale = False
+            ok = self.wal.compact(*snap, terms, commands) if snap else self.wal.append(start, terms, commands)
+            with self.lock:
+                if not ok:
+                    # Nothing written counts as durable: redo this pass (with any newer changes) after a pause
+                    self._wal_stale = True
+                    self.node.log("WAL write failed, retrying", level="ERROR")
+                    self.persist_cv.wait(0.1)
+                    continue
+                if snap: self._wal_base = snap[0]
+                if self._log_gen == gen: self._persisted_len = start + len(terms)
+                self.persisted_cv.notify_all()
+                leader = self.state == 'Leader'
+            # The leader's own copy only counts towards a majority once it is durable
+            if leader and terms: self._update_commit_index()
     
     def _last_log_index(self):
-        return len(self.log)
+        return self.snapshot_index + len(self.terms)
     
     def _last_log_term(self):
-        return self.log[-1]['term'] if self.log else 0
+        return self.terms[-1] if self.terms else self.snapshot_term
     
     def start(self):
         """Start Raft consensus background threads."""
@@ -60,153 +193,252 @@ class RaftConsensus:
         self.apply_thread = threading.Thread(target=self._run_apply_loop, daemon=True)
         self.apply_thread.start()
         
-        self.node.log(f"Raft started: term={self.current_term}, log_len={len(self.log)}")
+        self.persist_thread = threading.Thread(target=self._run_persister, daemon=True)
+        self.persist_thread.start()
+        
+        self.node.log(f"Raft started: term={self.current_term}, log_len={self._last_log_index()}")
     
     def stop(self):
         """Stop all background threads."""
         self.running = False
-        for t in [self.election_thread, self.heartbeat_thread, self.apply_thread]:
+        with self.lock:
+            self.apply_cv.notify_all()
+            self.election_cv.notify_all()
+            self.persist_cv.notify_all()
+            self.persisted_cv.notify_all()
+        for t in [self.election_thread, self.heartbeat_thread, self.apply_thread, self.persist_thread]:
             if t: t.join(timeout=1.0)
     
     def _run_election_timer(self):
         """Monitor for election timeouts."""
         while self.running:
-            time.sleep(0.01)
-            with self.lock:
-                if self.state == 'Leader': continue
-                if time.time() - self.last_heartbeat >= self.election_timeout:
-                    self._start_election()
+            with self.election_cv:
+                # Sleep until the current deadline; a heartbeat in the meantime just pushes it back
+                remaining = self.election_deadline - time.monotonic()
+                if self.state == 'Leader': self.election_cv.wait(self._timeout_base())
+                elif remaining > 0: self.election_cv.wait(remaining)
+                if self.state == 'Leader' or remaining > 0: continue
+            self._start_election()
     
     def _run_apply_loop(self):
-        """Periodically apply committed entries to the state machine."""
-        while self.running:
-            time.sleep(0.01)
-            self._apply_committed_entries()
+        """Apply committed entries to the state machine as soon as commit_index advances."""
+        with self.apply_cv:
+            while self.running:
+                self.apply_cv.wait_for(lambda: not self.running or self.last_applied < min(self.commit_index, self._last_log_index()))
+                self._apply_locked()
     
     def _apply_committed_entries(self):
         """Apply entries that are committed but not yet applied."""
-        with self.lock:
-            while self.last_applied < self.commit_index and self.last_applied < len(self.log):
-                self.last_applied += 1
-                entry = self.log[self.last_applied - 1]
-                command = entry['command']
-                success, result = self.state_machine.apply(command)
-                self.node.log(f"Applied log[{self.last_applied}]: {command} -> {result}")
+        with self.lock: self._apply_locked()
+    
+    def _apply_locked(self):
+        """Apply pending committed entries; caller holds self.lock."""
+        while self.last_applied < self.commit_index and self.last_applied < self._last_log_index():
+            self.last_applied += 1
+            command = self.commands[self.last_applied - self.snapshot_index - 1]
+            success, result = self.state_machine.apply(command)
+            self.node.log(f"Applied log[{self.last_applied}]: {command} -> {result}")
+        if self.last_applied - self.snapshot_index >= self.snapshot_every: self._take_snapshot()
+        self._publish_state()
+    
+    def _take_snapshot(self):
+        """Fold every applied entry into a state machine snapshot and drop it from the log; caller holds self.lock."""
+        drop = self.last_applied - self.snapshot_index
+        self.snapshot_index, self.snapshot_term = self.last_applied, self._term_at(self.last_applied)
+        self._snapshot_data = self.state_machine.snapshot()
+        del self.terms[:drop], self.commands[:drop], self._entry_pb[:drop]
+        self.persist_cv.notify()
+        self.node.log(f"Snapshot taken at index {self.snapshot_index}")
 
     def _start_election(self):
-        """Transition to Candidate and broadcast RequestVote RPCs."""
-        self.state = 'Candidate'
-        self.current_term += 1
-        self.voted_for = self.node.node_id
-        self.last_heartbeat = time.time()
-        self.election_timeout = self._random_timeout()
+        """Run a pre-vote; if a majority would elect us, become Candidate and broadcast RequestVote RPCs."""
+        # State changes happen in short locked sections; the vote RPCs run with the lock free
+        with self.lock:
+            self._reset_election_timer()
+            started = self.last_heartbeat
+            req = self._vote_request(self.current_term + 1, pre_vote=True)
         
-        term = self.current_term
-        candidate_id = self.node.node_id
-        last_index = self._last_log_index()
-        last_term = self._last_log_term()
+        # The pre-vote leaves term and vote untouched, so a node that cannot win never inflates the term
+        if not self._collect_votes(req): return
         
-        self._persist()
-        self.node.log(f"Starting election for term {term}")
+        with self.lock:
+            # A leader, a vote we cast or a newer term seen meanwhile all call the election off
+            if self.current_term != req.term - 1 or self.last_heartbeat != started: return
+            self.state = 'Candidate'
+            self.current_term += 1
+            self.voted_for = self.node.node_id
+            self._reset_election_timer()
+            term = self.current_term
+            req = self._vote_request(term)
+            saved = self._persist()
+            self._publish_state()
+            # Soliciting votes for a term we might forget on restart could get us two votes in it
+            if not saved: return
+            self.node.log(f"Starting election for term {term}")
         
-        self.lock.release()
+        if self._collect_votes(req): self._become_leader(term)
+        with self.lock:
+            if self.state == 'Candidate' and self.current_term == term:
+                self.node.log(f"Election failed/split for term {term}")
+    
+    def _vote_request(self, term, pre_vote=False):
+        """RequestVote args for this node at the given term; caller holds self.lock."""
+        return raft_pb2.RequestVoteArgs(
+            term=term, 
+            candidate_id=self.node.node_id, 
+            last_log_index=self._last_log_index(), 
+            last_log_term=self._last_log_term(),
+            pre_vote=pre_vote
+        )
+    
+    def _collect_votes(self, req):
+        """Send a (pre-)vote request to all peers; True once a majority including ourselves grants it."""
+        from concurrent.futures import ThreadPoolExecutor, as_completed
         
         votes = 1
         needed = (len(self.node.peers) + 1) // 2 + 1
-        
-        from infrastructure.comms import Communicator
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        
-        comm = Communicator(self.node)
-        req = raft_pb2.RequestVoteArgs(
-            term=term, 
-            candidate_id=candidate_id, 
-            last_log_index=last_index, 
-            last_log_term=last_term
-        )
-
         with ThreadPoolExecutor(max_workers=len(self.node.peers)) as executor:
-            futures = {executor.submit(comm.request_vote, p, req, timeout=0.1): p for p in self.node.peers}
+            futures = {executor.submit(self._comm.request_vote, p, req, timeout=0.1): p for p in self.node.peers}
             for fut in as_completed(futures):
                 res = fut.result()
                 if res and res.vote_granted:
                     votes += 1
-                    if votes >= needed:
-                        self._become_leader(term)
-                        break
-                elif res and res.term > term:
+                    if votes >= needed: return True
+                elif res and res.term > req.term:
                     self._step_down(res.term)
-                    break
-        
-        self.lock.acquire()
-        if self.state == 'Candidate' and self.current_term == term:
-            self.node.log(f"Election failed/split for term {term}")
+                    return False
+        return False
 
     def _become_leader(self, term):
         """Transition to Leader state and start heartbeats."""
         with self.lock:
             if self.current_term == term and self.state == 'Candidate':
                 self.state = 'Leader'
+                self._publish_state()
                 self.node.log(f"WON ELECTION! Became Leader for term {term}")
                 for p in self.node.peers:
-                    self.next_index[p['id']] = len(self.log) + 1
+                    self.next_index[p['id']] = self._last_log_index() + 1
                     self.match_index[p['id']] = 0
+                self._ack_until, self.leader_lease_expiry = {}, 0.0
                 if self.heartbeat_thread is None or not self.heartbeat_thread.is_alive():
                     self.heartbeat_thread = threading.Thread(target=self._send_heartbeats, daemon=True)
                     self.heartbeat_thread.start()
     
     def _send_heartbeats(self):
         """Background thread for the leader to send heartbeats and synchronize logs."""
-        from infrastructure.comms import Communicator
-        comm = Communicator(self.node)
-        while self.running:
-            with self.lock:
-                if self.state != 'Leader': return
-                term, commit_index = self.current_term, self.commit_index
-                log_snap, next_snap = list(self.log), dict(self.next_index)
-            
-            for p in self.node.peers:
-                p_id = p['id']
-                nxt = next_snap.get(p_id, 1)
-                prev_idx = nxt - 1
-                prev_term = log_snap[prev_idx-1]['term'] if prev_idx > 0 and prev_idx <= len(log_snap) else 0
-                entries = [raft_pb2.Entry(term=e['term'], command=e['command']) for e in log_snap[nxt-1:]]
+        # One AppendEntries stream per follower for the whole term, with one request in flight on each
+        streams = {}
+        try:
+            while self.running:
+                # Copy only each idle follower's next batch instead of the whole log
+                with self.lock:
+                    if self.state != 'Leader': return
+                    term, commit_index = self.current_term, self.commit_index
+                    batches, installs = [], []
+                    for p in self.node.peers:
+                        st = streams.get(p['id'])
+                        wait = st.waiting() if st and not st.closed else None
+                        if wait is not None:
+                            if wait < 0.5: continue
+                            st.close()  # no answer: the follower is hung, start over on a new stream
+                        prev_idx = self.next_index.get(p['id'], 1) - 1
+                        if prev_idx < self.snapshot_index:
+                            # The entries it needs were compacted away: send the snapshot instead
+                            if p['id'] not in self._installing:
+                                self._installing.add(p['id'])
+                                installs.append((p, raft_pb2.InstallSnapshotArgs(
+                                    term=term, leader_id=self.node.node_id, last_included_index=self.snapshot_index,
+                                    last_included_term=self.snapshot_term, data=json.dumps(self._snapshot_data).encode())))
+                            continue
+                        lo = prev_idx - self.snapshot_index
+                        batches.append((p, prev_idx, self._term_at(prev_idx), self._entry_pb[lo:lo + self.max_batch]))
                 
-                req = raft_pb2.AppendEntriesArgs(
-                    term=term, 
-                    leader_id=self.node.node_id, 
-                    prev_log_index=prev_idx, 
-                    prev_log_term=prev_term, 
-                    entries=entries, 
-                    leader_commit=commit_index
-                )
-                res = comm.append_entries(p, req, timeout=0.1)
+                for p, req in installs:
+                    threading.Thread(target=self._send_snapshot, args=(p, term, req), daemon=True).start()
                 
-                if res:
-                    if res.term > term:
-                        self._step_down(res.term)
-                        return
-                    with self.lock:
-                        if res.success:
-                            self.next_index[p_id] = len(log_snap) + 1
-                            self.match_index[p_id] = len(log_snap)
-                        elif self.next_index[p_id] > 1:
-                            self.next_index[p_id] -= 1
-            
-            self._update_commit_index()
-            time.sleep(0.05)
+                for p, prev_idx, prev_term, entries in batches:
+                    req = raft_pb2.AppendEntriesArgs(
+                        term=term, 
+                        leader_id=self.node.node_id, 
+                        prev_log_index=prev_idx, 
+                        prev_log_term=prev_term, 
+                        entries=entries, 
+                        leader_commit=commit_index,
+                        rtt=self.rtt_ewma
+                    )
+                    st = streams.get(p['id'])
+                    if st is None or st.closed:
+                        st = streams[p['id']] = self._comm.append_entries_stream(p)
+                        threading.Thread(target=self._read_replies, args=(st, p['id'], term), daemon=True).start()
+                    st.send(req, (prev_idx, len(entries), req.rtt))
+                
+                # Heartbeat interval, cut short by submit_command or a follower that still needs entries
+                self._replicate.wait(0.05)
+                self._replicate.clear()
+        finally:
+            for st in streams.values(): st.close()
+    
+    def _send_snapshot(self, peer, term, req):
+        """Install our snapshot on a follower that is behind it, then resume AppendEntries after it."""
+        res = self._comm.install_snapshot(peer, req, timeout=2.0)
+        with self.lock: self._installing.discard(peer['id'])
+        if not res: return
+        if res.term > term:
+            self._step_down(res.term)
+            return
+        with self.lock:
+            if not res.success or self.state != 'Leader' or self.current_term != term: return
+            self.match_index[peer['id']] = max(self.match_index.get(peer['id'], 0), req.last_included_index)
+            self.next_index[peer['id']] = max(self.next_index.get(peer['id'], 1), req.last_included_index + 1)
+        self._replicate.set()
+    
+    def _read_replies(self, stream, p_id, term):
+        """Apply a follower's AppendEntries replies as they arrive on its stream."""
+        for (prev_idx, sent, sent_rtt), rtt, res in stream.replies():
+            self._on_append_reply(res, p_id, term, prev_idx, sent, rtt, sent_rtt)
+    
+    def _on_append_reply(self, res, p_id, term, prev_idx, sent, rtt, sent_rtt):
+        """Advance a follower's indexes from an AppendEntries reply sent in the given term, with sent_rtt in its rtt field."""
+        if not res: return
+        if res.term > term:
+            self._step_down(res.term)
+            return
+        with self.lock:
+            if self.state != 'Leader' or self.current_term != term: return
+            self._renew_lease(p_id, time.monotonic() - rtt, sent_rtt)
+            self.rtt_ewma = 0.875 * self.rtt_ewma + 0.125 * rtt
+            if res.success:
+                self.next_index[p_id] = prev_idx + sent + 1
+                self.match_index[p_id] = prev_idx + sent
+            elif self.next_index[p_id] > 1:
+                self.next_index[p_id] -= 1
+            behind = self.next_index[p_id] <= self._last_log_index()
+        if res.success: self._update_commit_index()
+        if behind: self._replicate.set()
+    
+    def _renew_lease(self, p_id, sent_at, sent_rtt):
+        """Record an ack for a request sent at sent_at carrying sent_rtt, and extend the lease if a majority vouches; caller holds self.lock."""
+        # The follower refuses pre-votes for the timeout it derives from the rtt we sent it, not from our newer
+        # estimate; take the smaller of the two and keep a 10% margin
+        self._ack_until[p_id] = sent_at + 0.9 * min(self._timeout_base(sent_rtt), self._timeout_base())
+        until = sorted((self._ack_until.get(p['id'], 0.0) for p in self.node.peers), reverse=True)
+        # With our own vote, len(peers)//2 followers make a majority; the weakest of the best ones bounds the lease
+        n = (len(self.node.peers) + 1) // 2
+        self.leader_lease_expiry = max(self.leader_lease_expiry, until[n - 1])
     
     def _update_commit_index(self):
         """Advance commit index if a majority of nodes have replicated an entry."""
         with self.lock:
             if self.state != 'Leader': return
-            for n in range(len(self.log), self.commit_index, -1):
-                if self.log[n-1]['term'] != self.current_term: continue
-                count = 1 + sum(1 for p in self.node.peers if self.match_index.get(p['id'], 0) >= n)
-                if count > (len(self.node.peers) + 1) // 2:
-                    self.commit_index = n
-                    self.node.log(f"Committed up to index {n}")
-                    break
+            # Highest index held by a majority: the median of the match indexes (ours is what is on disk)
+            matches = sorted([self._persisted_len] + [self.match_index.get(p['id'], 0) for p in self.node.peers], reverse=True)
+            n = matches[len(matches) // 2]
+            # Entries from earlier terms only commit along with one from the current term
+            if n > self.commit_index and self._term_at(n) == self.current_term:
+                self.commit_index = n
+                self.apply_cv.notify()
+                self._publish_state()
+                self.node.log(f"Committed up to index {n}")
     
     def _step_down(self, term):
         """Revert to Follower state upon discovering a higher term."""
@@ -214,18 +446,27 @@ class RaftConsensus:
             if term > self.current_term:
                 self.node.log(f"Stepping down to term {term}")
                 self.current_term, self.voted_for, self.state = term, None, 'Follower'
-                self.last_heartbeat = time.time()
-                self.election_timeout = self._random_timeout()
+                self._reset_election_timer()
                 self._persist()
+                self._publish_state()
     
     def handle_request_vote(self, req):
         """Process RequestVote RPC from a Candidate."""
         with self.lock:
             if req.term < self.current_term:
                 return raft_pb2.RequestVoteReply(term=self.current_term, vote_granted=False)
+            if req.pre_vote:
+                # Would vote, without touching term or vote; refused while we still hear from a leader
+                l_term, l_idx = self._last_log_term(), self._last_log_index()
+                log_ok = (req.last_log_term > l_term or (req.last_log_term == l_term and req.last_log_index >= l_idx))
+                leader_alive = self.state == 'Leader' or time.monotonic() - self.last_append < self._timeout_base()
+                return raft_pb2.RequestVoteReply(term=self.current_term, vote_granted=req.term > self.current_term and log_ok and not leader_alive)
+            # A term bump and a vote in the same RPC are saved together, with one fsync before replying
+            dirty = False
             if req.term > self.current_term:
                 self.current_term, self.voted_for, self.state = req.term, None, 'Follower'
-                self._persist()
+                dirty = True
+                self._publish_state()
             
             l_term, l_idx = self._last_log_term(), self._last_log_index()
             log_ok = (req.last_log_term > l_term or (req.last_log_term == l_term and req.last_log_index >= l_idx))
@@ -233,10 +474,12 @@ class RaftConsensus:
             granted = False
             if (self.voted_for is None or self.voted_for == req.candidate_id) and log_ok:
                 granted = True
-                self.voted_for, self.last_heartbeat = req.candidate_id, time.time()
-                self.election_timeout = self._random_timeout()
-                self._persist()
+                dirty = dirty or self.voted_for != req.candidate_id
+                self.voted_for = req.candidate_id
+                self._reset_election_timer()
                 self.node.log(f"Voted for Node {req.candidate_id} (term {req.term})")
+            # A vote that isn't on disk could be cast again differently after a restart
+            if dirty and not self._persist(): granted = False
             return raft_pb2.RequestVoteReply(term=self.current_term, vote_granted=granted)
     
     def handle_append_entries(self, req):
@@ -249,49 +492,102 @@ class RaftConsensus:
                 self._persist()
             
             if self.state != 'Follower': self.state = 'Follower'
-            self.last_heartbeat, self.election_timeout = time.time(), self._random_timeout()
+            if req.rtt > 0: self.rtt_ewma = req.rtt
+            self.last_append = time.monotonic()
+            self._reset_election_timer()
             
-            if req.prev_log_index > 0:
-                if len(self.log) < req.prev_log_index or self.log[req.prev_log_index-1]['term'] != req.prev_log_term:
-                    if len(self.log) >= req.prev_log_index:
-                        self.log = self.log[:req.prev_log_index-1]
-                        self._persist()
-                    return raft_pb2.AppendEntriesReply(term=self.current_term, success=False)
-            
-            modified = False
-            for i, ent in enumerate(req.entries):
-                idx = req.prev_log_index + i + 1
-                if idx <= len(self.log):
-                    if self.log[idx-1]['term'] != ent.term:
-                        self.log = self.log[:idx-1]
-                        self.log.append({'term': ent.term, 'command': ent.command})
-                        modified = True
-                else:
-                    self.log.append({'term': ent.term, 'command': ent.command})
-                    modified = True
+            entries, start = req.entries, req.prev_log_index
+            if start < self.snapshot_index:
+                # Entries up to our snapshot are committed, so they match the leader's: skip those
+                entries, start = entries[self.snapshot_index - start:], self.snapshot_index
+            elif self._last_log_index() < start or self._term_at(start) != req.prev_log_term:
+                if self._last_log_index() >= start > self.snapshot_index:
+                    self._truncate_log(start - 1)
+                self._publish_state()
+                return raft_pb2.AppendEntriesReply(term=self.current_term, success=False)
             
-            if modified: self._persist()
+            # Skip entries we already hold, then truncate at the first conflict and append the rest in one go.
+            # Terms are compared as int64 arrays, so the usual all-match overlap is one C-level comparison.
+            incoming = array('q', [e.term for e in entries])
+            lo = start - self.snapshot_index
+            held = self.terms[lo:lo + len(incoming)]
+            i = len(held) if held == incoming[:len(held)] else next(j for j, (a, b) in enumerate(zip(held, incoming)) if a != b)
+            if i < len(entries):
+                if start + i < self._last_log_index(): self._truncate_log(start + i)
+                self.terms.extend(incoming[i:])
+                self.commands.extend(e.command for e in entries[i:])
+                self._entry_pb.extend(entries[i:])
+                self.persist_cv.notify()
             if req.leader_commit > self.commit_index:
-                self.commit_index = min(req.leader_commit, len(self.log))
-            return raft_pb2.AppendEntriesReply(term=self.current_term, success=True)
+                self.commit_index = min(req.leader_commit, self._last_log_index())
+                self.apply_cv.notify()
+            self._publish_state()
+            # Acknowledge only what is on disk; concurrent RPCs share the persister's fsync
+            ok = self._wait_persisted(start + len(entries))
+            return raft_pb2.AppendEntriesReply(term=self.current_term, success=ok)
     
-    def submit_command(self, command):
-        """Submit a command to the leader for replication."""
+    def handle_install_snapshot(self, req):
+        """Process InstallSnapshot RPC: replace the log up to the leader's snapshot with that snapshot."""
+        with self.lock:
+            if req.term < self.current_term:
+                return raft_pb2.InstallSnapshotReply(term=self.current_term)
+            if req.term > self.current_term:
+                self.current_term, self.voted_for = req.term, None
+                self._persist()
+            self.state = 'Follower'
+            self.last_append = time.monotonic()
+            self._reset_election_timer()
+            
+            idx = req.last_included_index
+            if idx > self.snapshot_index:
+                # Entries after the snapshot survive only if we hold its last entry with the same term
+                if idx < self._last_log_index() and self._term_at(idx) == req.last_included_term: drop = idx - self.snapshot_index
+                else: drop, self._log_gen = len(self.terms), self._log_gen + 1
+                del self.terms[:drop], self.commands[:drop], self._entry_pb[:drop]
+                self.snapshot_index, self.snapshot_term = idx, req.last_included_term
+                self._snapshot_data = json.loads(req.data)
+                if self.last_applied < idx:
+                    self.state_machine.restore(self._snapshot_data)
+                    self.last_applied = idx
+                self.commit_index = max(self.commit_index, idx)
+                self._persisted_len = idx
+                self.persist_cv.notify()
+                self.node.log(f"Installed snapshot up to index {idx} from Node {req.leader_id}")
+            self._publish_state()
+            # Acknowledge once the snapshot is on disk
+            self.persisted_cv.wait_for(lambda: not self.running or self._wal_base >= idx, self.persist_timeout)
+            return raft_pb2.InstallSnapshotReply(term=self.current_term, success=self._wal_base >= idx)
+    
+    def submit_command(self, *commands):
+        """Submit one or more commands to the leader for replication (concurrent submits share one WAL write)."""
         with self.lock:
             if self.state != 'Leader': return False, "Not leader"
-            self.log.append({'term': self.current_term, 'command': command})
-            self._persist()
-            self.node.log(f"Appended command at index {len(self.log)}: {command}")
-            return True, f"Appended at {len(self.log)}"
+            self.terms.extend([self.current_term] * len(commands))
+            self.commands.extend(commands)
+            self._entry_pb.extend(raft_pb2.Entry(term=self.current_term, command=c) for c in commands)
+            n = self._last_log_index()
+            self._publish_state()
+            self.persist_cv.notify()
+            # Followers can start on the entries while the persister writes our copy
+            self._replicate.set()
+            for i, command in enumerate(commands, n - len(commands) + 1):
+                self.node.log(f"Appended command at index {i}: {command}")
+            if not self._wait_persisted(n): return False, "Not persisted (log truncated, node stopping or WAL write timed out)"
+            return True, f"Appended at {n}"
     
-    def get_state(self):
-        """Get the current consensus state for monitoring."""
+    def can_read_locally(self):
+        """True while we are leader under an unexpired lease, so no other node can have been elected."""
+        return self.state == 'Leader' and (not self.node.peers or time.monotonic() < self.leader_lease_expiry)
+    
+    def linearizable_read(self, key):
+        """Read a key on the leader without a Raft round, if the lease allows it. Returns (success, value or error)."""
         with self.lock:
-            return {
-                'state': self.state, 
-                'term': self.current_term, 
-                'voted_for': self.voted_for, 
-                'log_length': len(self.log), 
-                'commit_index': self.commit_index, 
-                'last_applied': self.last_applied
-            }
+            if not self.can_read_locally(): return False, "Not leader or lease expired"
+            # Until an entry of our own term commits, commit_index may lag what the previous leader committed
+            if self._term_at(self.commit_index) != self.current_term: return False, "Leader not ready"
+            self._apply_locked()
+            return True, self.state_machine.get(key)
+    
+    def get_state(self):
+        """Get the current consensus state for monitoring (a read-only snapshot, taken without the lock)."""
+        return self._state_snapshot
@@ -48,3 +48,7 @@ class StateMachine:
     def snapshot(self):
         """Return a copy of the current state machine data."""
         with self.lock: return dict(self.data)
+    
+    def restore(self, data):
+        """Replace the state machine data with a snapshot taken by snapshot()."""
+        with self.lock: self.data = dict(data)
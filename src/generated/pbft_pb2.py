@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\npbft.proto\x12\x04pbft\"H\n\rClientRequest\x12\x11\n\toperation\x18\x01 \x01(\t\x12\x11\n\ttimestamp\x18\x02 \x01(\x03\x12\x11\n\tclient_id\x18\x03 \x01(\x05\"c\n\x0b\x43lientReply\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x11\n\ttimestamp\x18\x02 \x01(\x03\x12\x12\n\nreplica_id\x18\x03 \x01(\x05\x12\x0f\n\x07success\x18\x04 \x01(\x08\x12\x0e\n\x06result\x18\x05 \x01(\t\"}\n\x11PrePrepareRequest\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x10\n\x08sequence\x18\x02 \x01(\x03\x12\x0e\n\x06\x64igest\x18\x03 \x01(\t\x12$\n\x07request\x18\x04 \x01(\x0b\x32\x13.pbft.ClientRequest\x12\x12\n\nprimary_id\x18\x05 \x01(\x05\"#\n\x0fPrePrepareReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"T\n\x0ePrepareRequest\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x10\n\x08sequence\x18\x02 \x01(\x03\x12\x0e\n\x06\x64igest\x18\x03 \x01(\t\x12\x12\n\nreplica_id\x18\x04 \x01(\x05\" \n\x0cPrepareReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"S\n\rCommitRequest\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x10\n\x08sequence\x18\x02 \x01(\x03\x12\x0e\n\x06\x64igest\x18\x03 \x01(\t\x12\x12\n\nreplica_id\x18\x04 \x01(\x05\"\x1f\n\x0b\x43ommitReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"P\n\x11ViewChangeRequest\x12\x10\n\x08new_view\x18\x01 \x01(\x05\x12\x15\n\rlast_sequence\x18\x02 \x01(\x03\x12\x12\n\nreplica_id\x18\x03 \x01(\x05\"#\n\x0fViewChangeReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"i\n\x0eNewViewRequest\x12\x10\n\x08new_view\x18\x01 \x01(\x05\x12\x16\n\x0enew_primary_id\x18\x02 \x01(\x05\x12-\n\x0cpre_prepares\x18\x03 \x03(\x0b\x32\x17.pbft.PrePrepareRequest\" \n\x0cNewViewReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"\x0f\n\rStatusRequest\"}\n\x0bStatusReply\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x15\n\rlast_sequence\x18\x02 \x01(\x03\x12\x12\n\nprimary_id\x18\x03 \x01(\x05\x12\x12\n\nreplica_id\x18\x04 \x01(\x05\x12\x12\n\nis_primary\x18\x05 \x01(\x08\x12\r\n\x05state\x18\x06 \x01(\t2\x8d\x03\n\x0bPBFTService\x12<\n\nPrePrepare\x12\x17.pbft.PrePrepareRequest\x1a\x15.pbft.PrePrepareReply\x12\x33\n\x07Prepare\x12\x14.pbft.PrepareRequest\x1a\x12.pbft.PrepareReply\x12\x30\n\x06\x43ommit\x12\x13.pbft.CommitRequest\x1a\x11.pbft.CommitReply\x12\x31\n\x07Request\x12\x13.pbft.ClientRequest\x1a\x11.pbft.ClientReply\x12<\n\nViewChange\x12\x17.pbft.ViewChangeRequest\x1a\x15.pbft.ViewChangeReply\x12\x33\n\x07NewView\x12\x14.pbft.NewViewRequest\x1a\x12.pbft.NewViewReply\x12\x33\n\tGetStatus\x12\x13.pbft.StatusRequest\x1a\x11.pbft.StatusReplyb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\npbft.proto\x12\x04pbft\"\\\n\rClientRequest\x12\x11\n\toperation\x18\x01 \x01(\t\x12\x11\n\ttimestamp\x18\x02 \x01(\x03\x12\x11\n\tclient_id\x18\x03 \x01(\x05\x12\x12\n\noperations\x18\x04 \x03(\t\"c\n\x0b\x43lientReply\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x11\n\ttimestamp\x18\x02 \x01(\x03\x12\x12\n\nreplica_id\x18\x03 \x01(\x05\x12\x0f\n\x07success\x18\x04 \x01(\x08\x12\x0e\n\x06result\x18\x05 \x01(\t\"}\n\x11PrePrepareRequest\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x10\n\x08sequence\x18\x02 \x01(\x03\x12\x0e\n\x06\x64igest\x18\x03 \x01(\x0c\x12$\n\x07request\x18\x04 \x01(\x0b\x32\x13.pbft.ClientRequest\x12\x12\n\nprimary_id\x18\x05 \x01(\x05\"#\n\x0fPrePrepareReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"T\n\x0ePrepareRequest\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x10\n\x08sequence\x18\x02 \x01(\x03\x12\x0e\n\x06\x64igest\x18\x03 \x01(\x0c\x12\x12\n\nreplica_id\x18\x04 \x01(\x05\" \n\x0cPrepareReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"S\n\rCommitRequest\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x10\n\x08sequence\x18\x02 \x01(\x03\x12\x0e\n\x06\x64igest\x18\x03 \x01(\x0c\x12\x12\n\nreplica_id\x18\x04 \x01(\x05\"\x1f\n\x0b\x43ommitReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"P\n\x11ViewChangeRequest\x12\x10\n\x08new_view\x18\x01 \x01(\x05\x12\x15\n\rlast_sequence\x18\x02 \x01(\x03\x12\x12\n\nreplica_id\x18\x03 \x01(\x05\"#\n\x0fViewChangeReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"i\n\x0eNewViewRequest\x12\x10\n\x08new_view\x18\x01 \x01(\x05\x12\x16\n\x0enew_primary_id\x18\x02 \x01(\x05\x12-\n\x0cpre_prepares\x18\x03 \x03(\x0b\x32\x17.pbft.PrePrepareRequest\" \n\x0cNewViewReply\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\"\x0f\n\rStatusRequest\"}\n\x0bStatusReply\x12\x0c\n\x04view\x18\x01 \x01(\x05\x12\x15\n\rlast_sequence\x18\x02 \x01(\x03\x12\x12\n\nprimary_id\x18\x03 \x01(\x05\x12\x12\n\nreplica_id\x18\x04 \x01(\x05\x12\x12\n\nis_primary\x18\x05 \x01(\x08\x12\r\n\x05state\x18\x06 \x01(\t2\x8d\x03\n\x0bPBFTService\x12<\n\nPrePrepare\x12\x17.pbft.PrePrepareRequest\x1a\x15.pbft.PrePrepareReply\x12\x33\n\x07Prepare\x12\x14.pbft.PrepareRequest\x1a\x12.pbft.PrepareReply\x12\x30\n\x06\x43ommit\x12\x13.pbft.CommitRequest\x1a\x11.pbft.CommitReply\x12\x31\n\x07Request\x12\x13.pbft.ClientRequest\x1a\x11.pbft.ClientReply\x12<\n\nViewChange\x12\x17.pbft.ViewChangeRequest\x1a\x15.pbft.ViewChangeReply\x12\x33\n\x07NewView\x12\x14.pbft.NewViewRequest\x1a\x12.pbft.NewViewReply\x12\x33\n\tGetStatus\x12\x13.pbft.StatusRequest\x1a\x11.pbft.StatusReplyb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,33 +32,33 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'pbft_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_CLIENTREQUEST']._serialized_start=20
-  _globals['_CLIENTREQUEST']._serialized_end=92
-  _globals['_CLIENTREPLY']._serialized_start=94
-  _globals['_CLIENTREPLY']._serialized_end=193
-  _globals['_PREPREPAREREQUEST']._serialized_start=195
-  _globals['_PREPREPAREREQUEST']._serialized_end=320
-  _globals['_PREPREPAREREPLY']._serialized_start=322
-  _globals['_PREPREPAREREPLY']._serialized_end=357
-  _globals['_PREPAREREQUEST']._serialized_start=359
-  _globals['_PREPAREREQUEST']._serialized_end=443
-  _globals['_PREPAREREPLY']._serialized_start=445
-  _globals['_PREPAREREPLY']._serialized_end=477
-  _globals['_COMMITREQUEST']._serialized_start=479
-  _globals['_COMMITREQUEST']._serialized_end=562
-  _globals['_COMMITREPLY']._serialized_start=564
-  _globals['_COMMITREPLY']._serialized_end=595
-  _globals['_VIEWCHANGEREQUEST']._serialized_start=597
-  _globals['_VIEWCHANGEREQUEST']._serialized_end=677
-  _globals['_VIEWCHANGEREPLY']._serialized_start=679
-  _globals['_VIEWCHANGEREPLY']._serialized_end=714
-  _globals['_NEWVIEWREQUEST']._serialized_start=716
-  _globals['_NEWVIEWREQUEST']._serialized_end=821
-  _globals['_NEWVIEWREPLY']._serialized_start=823
-  _globals['_NEWVIEWREPLY']._serialized_end=855
-  _globals['_STATUSREQUEST']._serialized_start=857
-  _globals['_STATUSREQUEST']._serialized_end=872
-  _globals['_STATUSREPLY']._serialized_start=874
-  _globals['_STATUSREPLY']._serialized_end=999
-  _globals['_PBFTSERVICE']._serialized_start=1002
-  _globals['_PBFTSERVICE']._serialized_end=1399
+  _globals['_CLIENTREQUEST']._serialized_end=112
+  _globals['_CLIENTREPLY']._serialized_start=114
+  _globals['_CLIENTREPLY']._serialized_end=213
+  _globals['_PREPREPAREREQUEST']._serialized_start=215
+  _globals['_PREPREPAREREQUEST']._serialized_end=340
+  _globals['_PREPREPAREREPLY']._serialized_start=342
+  _globals['_PREPREPAREREPLY']._serialized_end=377
+  _globals['_PREPAREREQUEST']._serialized_start=379
+  _globals['_PREPAREREQUEST']._serialized_end=463
+  _globals['_PREPAREREPLY']._serialized_start=465
+  _globals['_PREPAREREPLY']._serialized_end=497
+  _globals['_COMMITREQUEST']._serialized_start=499
+  _globals['_COMMITREQUEST']._serialized_end=582
+  _globals['_COMMITREPLY']._serialized_start=584
+  _globals['_COMMITREPLY']._serialized_end=615
+  _globals['_VIEWCHANGEREQUEST']._serialized_start=617
+  _globals['_VIEWCHANGEREQUEST']._serialized_end=697
+  _globals['_VIEWCHANGEREPLY']._serialized_start=699
+  _globals['_VIEWCHANGEREPLY']._serialized_end=734
+  _globals['_NEWVIEWREQUEST']._serialized_start=736
+  _globals['_NEWVIEWREQUEST']._serialized_end=841
+  _globals['_NEWVIEWREPLY']._serialized_start=843
+  _globals['_NEWVIEWREPLY']._serialized_end=875
+  _globals['_STATUSREQUEST']._serialized_start=877
+  _globals['_STATUSREQUEST']._serialized_end=892
+  _globals['_STATUSREPLY']._serialized_start=894
+  _globals['_STATUSREPLY']._serialized_end=1019
+  _globals['_PBFTSERVICE']._serialized_start=1022
+  _globals['_PBFTSERVICE']._serialized_end=1419
 # @@protoc_insertion_point(module_scope)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nraft.proto\x12\x04raft\"&\n\x05\x45ntry\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07\x63ommand\x18\x02 \x01(\t\"d\n\x0fRequestVoteArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0c\x63\x61ndidate_id\x18\x02 \x01(\x05\x12\x16\n\x0elast_log_index\x18\x03 \x01(\x05\x12\x15\n\rlast_log_term\x18\x04 \x01(\x05\"6\n\x10RequestVoteReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0cvote_granted\x18\x02 \x01(\x08\"\x98\x01\n\x11\x41ppendEntriesArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\x16\n\x0eprev_log_index\x18\x03 \x01(\x05\x12\x15\n\rprev_log_term\x18\x04 \x01(\x05\x12\x1c\n\x07\x65ntries\x18\x05 \x03(\x0b\x32\x0b.raft.Entry\x12\x15\n\rleader_commit\x18\x06 \x01(\x05\"3\n\x12\x41ppendEntriesReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\" \n\x0bPingRequest\x12\x11\n\tsender_id\x18\x01 \x01(\x05\"1\n\tPingReply\x12\x13\n\x0breceiver_id\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x11\n\x0fGetStateRequest\"g\n\rGetStateReply\x12\r\n\x05state\x18\x01 \x01(\t\x12\x0c\n\x04term\x18\x02 \x01(\x05\x12\x0f\n\x07node_id\x18\x03 \x01(\x05\x12\x12\n\nlog_length\x18\x04 \x01(\x05\x12\x14\n\x0c\x63ommit_index\x18\x05 \x01(\x05\"\'\n\x14SubmitCommandRequest\x12\x0f\n\x07\x63ommand\x18\x01 \x01(\t\"I\n\x12SubmitCommandReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\tleader_id\x18\x03 \x01(\x05\"\x1d\n\x0eGetDataRequest\x12\x0b\n\x03key\x18\x01 \x01(\t\"?\n\x0cGetDataReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05value\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t2\xef\x02\n\x0bRaftService\x12<\n\x0bRequestVote\x12\x15.raft.RequestVoteArgs\x1a\x16.raft.RequestVoteReply\x12\x42\n\rAppendEntries\x12\x17.raft.AppendEntriesArgs\x1a\x18.raft.AppendEntriesReply\x12*\n\x04Ping\x12\x11.raft.PingRequest\x1a\x0f.raft.PingReply\x12\x36\n\x08GetState\x12\x15.raft.GetStateRequest\x1a\x13.raft.GetStateReply\x12\x45\n\rSubmitCommand\x12\x1a.raft.SubmitCommandRequest\x1a\x18.raft.SubmitCommandReply\x12\x33\n\x07GetData\x12\x14.raft.GetDataRequest\x1a\x12.raft.GetDataReplyb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nraft.proto\x12\x04raft\"&\n\x05\x45ntry\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07\x63ommand\x18\x02 \x01(\t\"v\n\x0fRequestVoteArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0c\x63\x61ndidate_id\x18\x02 \x01(\x05\x12\x16\n\x0elast_log_index\x18\x03 \x01(\x05\x12\x15\n\rlast_log_term\x18\x04 \x01(\x05\x12\x10\n\x08pre_vote\x18\x05 \x01(\x08\"6\n\x10RequestVoteReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0cvote_granted\x18\x02 \x01(\x08\"\xa5\x01\n\x11\x41ppendEntriesArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\x16\n\x0eprev_log_index\x18\x03 \x01(\x05\x12\x15\n\rprev_log_term\x18\x04 \x01(\x05\x12\x1c\n\x07\x65ntries\x18\x05 \x03(\x0b\x32\x0b.raft.Entry\x12\x15\n\rleader_commit\x18\x06 \x01(\x05\x12\x0b\n\x03rtt\x18\x07 \x01(\x02\"}\n\x13InstallSnapshotArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\x1b\n\x13last_included_index\x18\x03 \x01(\x05\x12\x1a\n\x12last_included_term\x18\x04 \x01(\x05\x12\x0c\n\x04\x64\x61ta\x18\x05 \x01(\x0c\"5\n\x14InstallSnapshotReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\"3\n\x12\x41ppendEntriesReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\" \n\x0bPingRequest\x12\x11\n\tsender_id\x18\x01 \x01(\x05\"1\n\tPingReply\x12\x13\n\x0breceiver_id\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x11\n\x0fGetStateRequest\"g\n\rGetStateReply\x12\r\n\x05state\x18\x01 \x01(\t\x12\x0c\n\x04term\x18\x02 \x01(\x05\x12\x0f\n\x07node_id\x18\x03 \x01(\x05\x12\x12\n\nlog_length\x18\x04 \x01(\x05\x12\x14\n\x0c\x63ommit_index\x18\x05 \x01(\x05\"7\n\x11\x43lusterStateReply\x12\"\n\x05nodes\x18\x01 \x03(\x0b\x32\x13.raft.GetStateReply\"9\n\x14SubmitCommandRequest\x12\x0f\n\x07\x63ommand\x18\x01 \x01(\t\x12\x10\n\x08\x63ommands\x18\x02 \x03(\t\"I\n\x12SubmitCommandReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\tleader_id\x18\x03 \x01(\x05\"3\n\x0eGetDataRequest\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x14\n\x0clinearizable\x18\x02 \x01(\x08\"?\n\x0cGetDataReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05value\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t2\x8a\x05\n\x0bRaftService\x12<\n\x0bRequestVote\x12\x15.raft.RequestVoteArgs\x1a\x16.raft.RequestVoteReply\x12\x42\n\rAppendEntries\x12\x17.raft.AppendEntriesArgs\x1a\x18.raft.AppendEntriesReply\x12L\n\x13\x41ppendEntriesStream\x12\x17.raft.AppendEntriesArgs\x1a\x18.raft.AppendEntriesReply(\x01\x30\x01\x12H\n\x0fInstallSnapshot\x12\x19.raft.InstallSnapshotArgs\x1a\x1a.raft.InstallSnapshotReply\x12*\n\x04Ping\x12\x11.raft.PingRequest\x1a\x0f.raft.PingReply\x12\x36\n\x08GetState\x12\x15.raft.GetStateRequest\x1a\x13.raft.GetStateReply\x12\x41\n\x0fGetClusterState\x12\x15.raft.GetStateRequest\x1a\x17.raft.ClusterStateReply\x12>\n\x0eSubscribeState\x12\x15.raft.GetStateRequest\x1a\x13.raft.GetStateReply0\x01\x12\x45\n\rSubmitCommand\x12\x1a.raft.SubmitCommandRequest\x1a\x18.raft.SubmitCommandReply\x12\x33\n\x07GetData\x12\x14.raft.GetDataRequest\x1a\x12.raft.GetDataReplyb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,29 +34,35 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_ENTRY']._serialized_start=20
   _globals['_ENTRY']._serialized_end=58
   _globals['_REQUESTVOTEARGS']._serialized_start=60
-  _globals['_REQUESTVOTEARGS']._serialized_end=160
-  _globals['_REQUESTVOTEREPLY']._serialized_start=162
-  _globals['_REQUESTVOTEREPLY']._serialized_end=216
-  _globals['_APPENDENTRIESARGS']._serialized_start=219
-  _globals['_APPENDENTRIESARGS']._serialized_end=371
-  _globals['_APPENDENTRIESREPLY']._serialized_start=373
-  _globals['_APPENDENTRIESREPLY']._serialized_end=424
-  _globals['_PINGREQUEST']._serialized_start=426
-  _globals['_PINGREQUEST']._serialized_end=458
-  _globals['_PINGREPLY']._serialized_start=460
-  _globals['_PINGREPLY']._serialized_end=509
-  _globals['_GETSTATEREQUEST']._serialized_start=511
-  _globals['_GETSTATEREQUEST']._serialized_end=528
-  _globals['_GETSTATEREPLY']._serialized_start=530
-  _globals['_GETSTATEREPLY']._serialized_end=633
-  _globals['_SUBMITCOMMANDREQUEST']._serialized_start=635
-  _globals['_SUBMITCOMMANDREQUEST']._serialized_end=674
-  _globals['_SUBMITCOMMANDREPLY']._serialized_start=676
-  _globals['_SUBMITCOMMANDREPLY']._serialized_end=749
-  _globals['_GETDATAREQUEST']._serialized_start=751
-  _globals['_GETDATAREQUEST']._serialized_end=780
-  _globals['_GETDATAREPLY']._serialized_start=782
-  _globals['_GETDATAREPLY']._serialized_end=845
-  _globals['_RAFTSERVICE']._serialized_start=848
-  _globals['_RAFTSERVICE']._serialized_end=1215
+  _globals['_REQUESTVOTEARGS']._serialized_end=178
+  _globals['_REQUESTVOTEREPLY']._serialized_start=180
+  _globals['_REQUESTVOTEREPLY']._serialized_end=234
+  _globals['_APPENDENTRIESARGS']._serialized_start=237
+  _globals['_APPENDENTRIESARGS']._serialized_end=402
+  _globals['_INSTALLSNAPSHOTARGS']._serialized_start=404
+  _globals['_INSTALLSNAPSHOTARGS']._serialized_end=529
+  _globals['_INSTALLSNAPSHOTREPLY']._serialized_start=531
+  _globals['_INSTALLSNAPSHOTREPLY']._serialized_end=584
+  _globals['_APPENDENTRIESREPLY']._serialized_start=586
+  _globals['_APPENDENTRIESREPLY']._serialized_end=637
+  _globals['_PINGREQUEST']._serialized_start=639
+  _globals['_PINGREQUEST']._serialized_end=671
+  _globals['_PINGREPLY']._serialized_start=673
+  _globals['_PINGREPLY']._serialized_end=722
+  _globals['_GETSTATEREQUEST']._serialized_start=724
+  _globals['_GETSTATEREQUEST']._serialized_end=741
+  _globals['_GETSTATEREPLY']._serialized_start=743
+  _globals['_GETSTATEREPLY']._serialized_end=846
+  _globals['_CLUSTERSTATEREPLY']._serialized_start=848
+  _globals['_CLUSTERSTATEREPLY']._serialized_end=903
+  _globals['_SUBMITCOMMANDREQUEST']._serialized_start=905
+  _globals['_SUBMITCOMMANDREQUEST']._serialized_end=962
+  _globals['_SUBMITCOMMANDREPLY']._serialized_start=964
+  _globals['_SUBMITCOMMANDREPLY']._serialized_end=1037
+  _globals['_GETDATAREQUEST']._serialized_start=1039
+  _globals['_GETDATAREQUEST']._serialized_end=1090
+  _globals['_GETDATAREPLY']._serialized_start=1092
+  _globals['_GETDATAREPLY']._serialized_end=1155
+  _globals['_RAFTSERVICE']._serialized_start=1158
+  _globals['_RAFTSERVICE']._serialized_end=1808
 # @@protoc_insertion_point(module_scope)
@@ -45,6 +45,16 @@ class RaftServiceStub(object):
                 request_serializer=raft__pb2.AppendEntriesArgs.SerializeToString,
                 response_deserializer=raft__pb2.AppendEntriesReply.FromString,
                 _registered_method=True)
+        self.AppendEntriesStream = channel.stream_stream(
+                '/raft.RaftService/AppendEntriesStream',
+                request_serializer=raft__pb2.AppendEntriesArgs.SerializeToString,
+                response_deserializer=raft__pb2.AppendEntriesReply.FromString,
+                _registered_method=True)
+        self.InstallSnapshot = channel.unary_unary(
+                '/raft.RaftService/InstallSnapshot',
+                request_serializer=raft__pb2.InstallSnapshotArgs.SerializeToString,
+                response_deserializer=raft__pb2.InstallSnapshotReply.FromString,
+                _registered_method=True)
         self.Ping = channel.unary_unary(
                 '/raft.RaftService/Ping',
                 request_serializer=raft__pb2.PingRequest.SerializeToString,
@@ -55,6 +65,16 @@ class RaftServiceStub(object):
                 request_serializer=raft__pb2.GetStateRequest.SerializeToString,
                 response_deserializer=raft__pb2.GetStateReply.FromString,
                 _registered_method=True)
+        self.GetClusterState = channel.unary_unary(
+                '/raft.RaftService/GetClusterState',
+                request_serializer=raft__pb2.GetStateRequest.SerializeToString,
+                response_deserializer=raft__pb2.ClusterStateReply.FromString,
+                _registered_method=True)
+        self.SubscribeState = channel.unary_stream(
+                '/raft.RaftService/SubscribeState',
+                request_serializer=raft__pb2.GetStateRequest.SerializeToString,
+                response_deserializer=raft__pb2.GetStateReply.FromString,
+                _registered_method=True)
         self.SubmitCommand = channel.unary_unary(
                 '/raft.RaftService/SubmitCommand',
                 request_serializer=raft__pb2.SubmitCommandRequest.SerializeToString,
@@ -83,6 +103,19 @@ class RaftServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def AppendEntriesStream(self, request_iterator, context):
+        """One reply per request, in order
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def InstallSnapshot(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def Ping(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -95,6 +128,19 @@ class RaftServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetClusterState(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubscribeState(self, request, context):
+        """Pushes a snapshot on every change
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def SubmitCommand(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -120,6 +166,16 @@ def add_RaftServiceServicer_to_server(servicer, server):
                     request_deserializer=raft__pb2.AppendEntriesArgs.FromString,
                     response_serializer=raft__pb2.AppendEntriesReply.SerializeToString,
             ),
+            'AppendEntriesStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.AppendEntriesStream,
+                    request_deserializer=raft__pb2.AppendEntriesArgs.FromString,
+                    response_serializer=raft__pb2.AppendEntriesReply.SerializeToString,
+            ),
+            'InstallSnapshot': grpc.unary_unary_rpc_method_handler(
+                    servicer.InstallSnapshot,
+                    request_deserializer=raft__pb2.InstallSnapshotArgs.FromString,
+                    response_serializer=raft__pb2.InstallSnapshotReply.SerializeToString,
+            ),
             'Ping': grpc.unary_unary_rpc_method_handler(
                     servicer.Ping,
                     request_deserializer=raft__pb2.PingRequest.FromString,
@@ -130,6 +186,16 @@ def add_RaftServiceServicer_to_server(servicer, server):
                     request_deserializer=raft__pb2.GetStateRequest.FromString,
                     response_serializer=raft__pb2.GetStateReply.SerializeToString,
             ),
+            'GetClusterState': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetClusterState,
+                    request_deserializer=raft__pb2.GetStateRequest.FromString,
+                    response_serializer=raft__pb2.ClusterStateReply.SerializeToString,
+            ),
+            'SubscribeState': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeState,
+                    request_deserializer=raft__pb2.GetStateRequest.FromString,
+                    response_serializer=raft__pb2.GetStateReply.SerializeToString,
+            ),
             'SubmitCommand': grpc.unary_unary_rpc_method_handler(
                     servicer.SubmitCommand,
                     request_deserializer=raft__pb2.SubmitCommandRequest.FromString,
@@ -206,6 +272,60 @@ class RaftService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def AppendEntriesStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/raft.RaftService/AppendEntriesStream',
+            raft__pb2.AppendEntriesArgs.SerializeToString,
+            raft__pb2.AppendEntriesReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def InstallSnapshot(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/raft.RaftService/InstallSnapshot',
+            raft__pb2.InstallSnapshotArgs.SerializeToString,
+            raft__pb2.InstallSnapshotReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def Ping(request,
             target,
@@ -260,6 +380,60 @@ class RaftService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def GetClusterState(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/raft.RaftService/GetClusterState',
+            raft__pb2.GetStateRequest.SerializeToString,
+            raft__pb2.ClusterStateReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubscribeState(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/raft.RaftService/SubscribeState',
+            raft__pb2.GetStateRequest.SerializeToString,
+            raft__pb2.GetStateReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def SubmitCommand(request,
             target,
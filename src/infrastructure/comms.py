@@ -1,6 +1,67 @@
 import grpc
+import queue
+import threading
+import time
+from collections import deque
 from generated import raft_pb2, raft_pb2_grpc, control_pb2, control_pb2_grpc, pbft_pb2, pbft_pb2_grpc
 
+# Field-less requests, built once and shared by every call (gRPC only serializes them)
+_STATE_REQ, _STATUS_REQ = raft_pb2.GetStateRequest(), pbft_pb2.StatusRequest()
+_PBFT_STUB = pbft_pb2_grpc.PBFTServiceStub
+_LOCAL_POOL = [('grpc.use_local_subchannel_pool', 1)]
+
+class _PBFTPhaseStub:
+    """PBFTService phase methods taking requests already serialized to bytes, so a broadcast encodes once."""
+    def __init__(self, channel):
+        for method in ('PrePrepare', 'Prepare', 'Commit', 'ViewChange'):
+            setattr(self, method, channel.unary_unary(f'/pbft.PBFTService/{method}'))
+
+class AppendEntriesStream:
+    """
+    Bidirectional AppendEntries stream to one peer. Each request is sent with a caller
+    tag; the server answers in order, so replies come back paired with their tag.
+    """
+    def __init__(self, comm, peer):
+        self._comm, self._peer = comm, peer
+        self._out, self._tags = queue.SimpleQueue(), deque()
+        self.closed = self._cancelled = False
+        # The channel this stream runs on: only that one is dropped if the stream breaks
+        self._chan, stub = comm._get_entry(peer)
+        self._call = stub.AppendEntriesStream(iter(self._out.get, None))
+        self._call.add_done_callback(self._done)
+    
+    def send(self, req, tag):
+        """Queue a request; False (nothing sent) if the stream is closed or the peer is partitioned away."""
+        if self.closed or self._comm._is_blocked(self._peer): return False
+        self._tags.append((tag, time.monotonic()))
+        self._out.put(req)
+        return True
+    
+    def waiting(self):
+        """Seconds the oldest unanswered request has been waiting, or None if all are answered."""
+        try: return time.monotonic() - self._tags[0][1]
+        except IndexError: return None
+    
+    def replies(self):
+        """Yield (tag, round trip seconds, reply) until the stream ends."""
+        try:
+            for res in self._call:
+                tag, t0 = self._tags.popleft()
+                yield tag, time.monotonic() - t0, res
+        except: pass
+        self.closed = True
+    
+    def close(self):
+        self.closed = self._cancelled = True
+        self._out.put(None)
+        self._call.cancel()
+    
+    def _done(self, call):
+        # A broken stream drops its channel, so the next one connects afresh (see Communicator._drop_client).
+        # Our own close() cancelling it says nothing about the channel, which other calls may be using.
+        self.closed = True
+        if not self._cancelled and call.code() != grpc.StatusCode.OK: self._comm._drop_client(self._peer, self._chan)
+
 class Communicator:
     """
     Client-side communication wrapper for both Raft and pBFT services.
@@ -9,10 +70,87 @@ class Communicator:
     
     def __init__(self, node):
         self.node = node
+        self._clients, self._lock = {}, threading.Lock()
     
     def _get_channel(self, peer):
         return grpc.insecure_channel(f"{peer['ip']}:{peer['port']}")
     
+    def _get_entry(self, peer, stub_cls=raft_pb2_grpc.RaftServiceStub):
+        """(channel, stub) from the peer's persistent channel (one stub per service on it), so repeated calls reuse one connection."""
+        addr = f"{peer['ip']}:{peer['port']}"
+        with self._lock:
+            # A local subchannel pool keeps a fresh channel from inheriting the old one's reconnect backoff
+            if addr not in self._clients: self._clients[addr] = (grpc.insecure_channel(addr, options=_LOCAL_POOL), {})
+            chan, stubs = self._clients[addr]
+            if stub_cls not in stubs: stubs[stub_cls] = stub_cls(chan)
+            return chan, stubs[stub_cls]
+    
+    def _get_client(self, peer, stub_cls=raft_pb2_grpc.RaftServiceStub):
+        return self._get_entry(peer, stub_cls)[1]
+    
+    def _drop_client(self, peer, chan):
+        """
+        Discard a peer's cached channel after a call on `chan` failed. An idle channel stuck in
+        TRANSIENT_FAILURE only retries on its backoff timer (seconds), whereas a fresh
+        one connects immediately once the peer is back. If the cache already holds a newer
+        channel, that one is left alone: calls in flight on it have not failed.
+        """
+        addr = f"{peer['ip']}:{peer['port']}"
+        with self._lock:
+            entry = self._clients.get(addr)
+            if not entry or entry[0] is not chan: return
+            del self._clients[addr]
+        chan.close()
+    
+    def _cached_call(self, peer, call, stub_cls=raft_pb2_grpc.RaftServiceStub, retry=True):
+        """
+        Run call(stub) on the peer's cached stub. If a reused channel fails (typically
+        the peer restarted since it was opened), retry once on a fresh channel, unless
+        retry=False because the call is not safe to repeat.
+        """
+        with self._lock: reused = f"{peer['ip']}:{peer['port']}" in self._clients
+        chan, stub = self._get_entry(peer, stub_cls)
+        try: return call(stub)
+        except:
+            self._drop_client(peer, chan)
+            if not (reused and retry): raise
+        chan, stub = self._get_entry(peer, stub_cls)
+        try: return call(stub)
+        except:
+            self._drop_client(peer, chan)
+            raise
+    
+    def cast(self, peer, method, req, timeout=1.0, stub_cls=pbft_pb2_grpc.PBFTServiceStub):
+        """
+        Fire-and-forget unary call: starts it as a gRPC future on the cached channel and
+        returns at once, the reply being ignored. A failure drops the channel and, if it
+        was a reused one, the call is retried once on a fresh channel, as in _cached_call.
+        """
+        addr = f"{peer['ip']}:{peer['port']}"
+        def _fire(retry):
+            try:
+                chan, stub = self._get_entry(peer, stub_cls)
+                fut = getattr(stub, method).future(req, timeout=timeout)
+            except: return
+            def _done(f):
+                if not f.cancelled() and f.exception() is None: return
+                # Only the channel this call went out on: a newer cached one may carry other casts
+                self._drop_client(peer, chan)
+                if retry: _fire(False)
+            fut.add_done_callback(_done)
+        with self._lock: reused = addr in self._clients
+        _fire(reused)
+    
+    def pbft_cast(self, peer, method, payload, timeout=1.0):
+        """cast() a pBFT phase message given as req.SerializeToString() bytes; a broadcast passes one payload to every peer."""
+        self.cast(peer, method, payload, timeout, _PBFTPhaseStub)
+    
+    def close(self):
+        """Close every cached channel."""
+        with self._lock:
+            for chan, _ in self._clients.values(): chan.close()
+            self._clients.clear()
+    
     def _is_blocked(self, peer):
         """Check if communication with the peer should be blocked (partition simulation)."""
         return peer.get('id') in self.node.blocked_node_ids or peer.get('ip') in self.node.blocked_ips
@@ -26,81 +164,95 @@ class Communicator:
     
     def request_vote(self, peer, args, timeout=1.0):
         if self._is_blocked(peer): return None
-        try:
-            with self._get_channel(peer) as chan:
-                return raft_pb2_grpc.RaftServiceStub(chan).RequestVote(args, timeout=timeout)
+        try: return self._cached_call(peer, lambda s: s.RequestVote(args, timeout=timeout))
         except: return None
     
     def append_entries(self, peer, args, timeout=1.0):
         if self._is_blocked(peer): return None
-        try:
-            with self._get_channel(peer) as chan:
-                return raft_pb2_grpc.RaftServiceStub(chan).AppendEntries(args, timeout=timeout)
+        try: return self._cached_call(peer, lambda s: s.AppendEntries(args, timeout=timeout))
+        except: return None
+    
+    def install_snapshot(self, peer, args, timeout=2.0):
+        if self._is_blocked(peer): return None
+        try: return self._cached_call(peer, lambda s: s.InstallSnapshot(args, timeout=timeout))
         except: return None
     
+    def append_entries_stream(self, peer):
+        """Open a long-lived AppendEntries stream to the peer on its cached channel."""
+        return AppendEntriesStream(self, peer)
+    
     def set_partition(self, peer, blocked_ips=None, blocked_node_ids=None):
-        try:
-            with self._get_channel(peer) as chan:
-                return control_pb2_grpc.ControlServiceStub(chan).SetPartition(
-                    control_pb2.PartitionRequest(blocked_ips=blocked_ips or [], 
-                    blocked_node_ids=blocked_node_ids or []), timeout=1.0)
+        req = control_pb2.PartitionRequest(blocked_ips=blocked_ips or [], blocked_node_ids=blocked_node_ids or [])
+        try: return self._cached_call(peer, lambda stub: stub.SetPartition(req, timeout=1.0), control_pb2_grpc.ControlServiceStub)
         except: return None
     
-    def get_state(self, peer):
-        try:
-            with self._get_channel(peer) as chan:
-                return raft_pb2_grpc.RaftServiceStub(chan).GetState(
-                    raft_pb2.GetStateRequest(), timeout=1.0)
+    def get_state(self, peer, timeout=1.0):
+        try: return self._cached_call(peer, lambda stub: stub.GetState(_STATE_REQ, timeout=timeout))
         except: return None
     
+    def get_cluster_state(self, peer, timeout=2.0):
+        """
+        Ask one node for the whole cluster's state in a single round-trip.
+        Returns its list of GetStateReply, or None if the peer is unreachable
+        or predates the RPC (callers then fall back to per-peer get_state).
+        """
+        try: return list(self._cached_call(peer, lambda stub: stub.GetClusterState(_STATE_REQ, timeout=timeout)).nodes)
+        except: return None
+    
+    def get_cluster_states(self, peer, timeout=2.0):
+        """get_cluster_state as {node_id: {'state', 'term'}}, or None on failure."""
+        nodes = self.get_cluster_state(peer, timeout=timeout)
+        if nodes is None: return None
+        return {n.node_id: {'state': n.state, 'term': n.term} for n in nodes}
+    
+    def subscribe_state(self, peer, timeout=5.0):
+        """
+        Open a SubscribeState stream on a dedicated channel (a cached one may still be
+        backing off after the peer restarted). Returns (channel, call): iterate the call
+        for a GetStateReply per change; cancel it and close the channel when done.
+        """
+        chan = self._get_channel(peer)
+        return chan, raft_pb2_grpc.RaftServiceStub(chan).SubscribeState(
+            _STATE_REQ, timeout=timeout, wait_for_ready=True)
+    
     def submit_command(self, peer, cmd, timeout=2.0):
-        try:
-            with self._get_channel(peer) as chan:
-                return raft_pb2_grpc.RaftServiceStub(chan).SubmitCommand(
-                    raft_pb2.SubmitCommandRequest(command=cmd), timeout=timeout)
+        # Not retried: the first attempt may have reached the leader and been appended
+        req = raft_pb2.SubmitCommandRequest(command=cmd)
+        try: return self._cached_call(peer, lambda stub: stub.SubmitCommand(req, timeout=timeout), retry=False)
         except: return None
     
-    def get_data(self, peer, key, timeout=1.0):
-        try:
-            with self._get_channel(peer) as chan:
-                return raft_pb2_grpc.RaftServiceStub(chan).GetData(
-                    raft_pb2.GetDataRequest(key=key), timeout=timeout)
+    def submit_commands(self, peer, cmds, timeout=2.0):
+        """Append several commands in one RPC (and one WAL write on the leader)."""
+        req = raft_pb2.SubmitCommandRequest(commands=cmds)
+        try: return self._cached_call(peer, lambda stub: stub.SubmitCommand(req, timeout=timeout), retry=False)
+        except: return None
+    
+    def get_data(self, peer, key, timeout=1.0, linearizable=False):
+        req = raft_pb2.GetDataRequest(key=key, linearizable=linearizable)
+        try: return self._cached_call(peer, lambda stub: stub.GetData(req, timeout=timeout))
         except: return None
 
     # pBFT Methods
     def pbft_pre_prepare(self, peer, req, timeout=1.0):
-        try:
-            with self._get_channel(peer) as chan:
-                return pbft_pb2_grpc.PBFTServiceStub(chan).PrePrepare(req, timeout=timeout)
+        try: return self._cached_call(peer, lambda stub: stub.PrePrepare(req, timeout=timeout), _PBFT_STUB)
         except: return None
     
     def pbft_prepare(self, peer, req, timeout=1.0):
-        try:
-            with self._get_channel(peer) as chan:
-                return pbft_pb2_grpc.PBFTServiceStub(chan).Prepare(req, timeout=timeout)
+        try: return self._cached_call(peer, lambda stub: stub.Prepare(req, timeout=timeout), _PBFT_STUB)
         except: return None
     
     def pbft_commit(self, peer, req, timeout=1.0):
-        try:
-            with self._get_channel(peer) as chan:
-                return pbft_pb2_grpc.PBFTServiceStub(chan).Commit(req, timeout=timeout)
+        try: return self._cached_call(peer, lambda stub: stub.Commit(req, timeout=timeout), _PBFT_STUB)
         except: return None
     
     def pbft_view_change(self, peer, req, timeout=1.0):
-        try:
-            with self._get_channel(peer) as chan:
-                return pbft_pb2_grpc.PBFTServiceStub(chan).ViewChange(req, timeout=timeout)
+        try: return self._cached_call(peer, lambda stub: stub.ViewChange(req, timeout=timeout), _PBFT_STUB)
         except: return None
     
     def pbft_request(self, peer, req, timeout=5.0):
-        try:
-            with self._get_channel(peer) as chan:
-                return pbft_pb2_grpc.PBFTServiceStub(chan).Request(req, timeout=timeout)
+        try: return self._cached_call(peer, lambda stub: stub.Request(req, timeout=timeout), _PBFT_STUB, retry=False)
         except: return None
     
     def pbft_get_status(self, peer, timeout=1.0):
-        try:
-            with self._get_channel(peer) as chan:
-                return pbft_pb2_grpc.PBFTServiceStub(chan).GetStatus(
-                    pbft_pb2.StatusRequest(), timeout=timeout)
+        try: return self._cached_call(peer, lambda stub: stub.GetStatus(_STATUS_REQ, timeout=timeout), _PBFT_STUB)
         except: return None
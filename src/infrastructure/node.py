@@ -3,23 +3,33 @@ import os
 import json
 import grpc
 from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
 from generated import raft_pb2, raft_pb2_grpc, control_pb2, control_pb2_grpc
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from consensus.raft import RaftConsensus
+from infrastructure.comms import Communicator
 
 class Node:
     """
     Main cluster node supporting Raft and administrative Control services.
     """
     
-    def __init__(self, node_id, config_path='nodes_config.json'):
+    def __init__(self, node_id, config_path='nodes_config.json', base_port=None, data_dir=".", probe_only=False, snapshot_every=10000):
         self.node_id = node_id
+        self.data_dir = data_dir
+        self.snapshot_every = snapshot_every
         self.config = self._load_config(config_path)
+        # Relocate the whole cluster to base_port + id so isolated clusters can share a host
+        if base_port is not None:
+            for n in self.config: n['port'] = base_port + n['id']
         self.node_info = next(n for n in self.config if n['id'] == node_id)
         self.peers = [n for n in self.config if n['id'] != node_id]
         self.blocked_ips, self.blocked_node_ids = set(), set()
-        self.raft = RaftConsensus(self)
+        # One Communicator for the node's lifetime, shared by Raft and GetClusterState, so RPCs reuse its per-peer channels
+        self.comm = Communicator(self)
+        # A probe only sends client RPCs: no consensus state, so no WAL is read
+        self.raft = None if probe_only else RaftConsensus(self)
         
     def _load_config(self, path):
         """Load cluster configuration from JSON file."""
@@ -30,6 +40,19 @@ class Node:
         """Professional plain-text logging to stdout."""
         print(f"[{level}][Node {self.node_id}] {message}")
     
+    def state_reply(self):
+        """Snapshot of this node's Raft state as a GetStateReply."""
+        s = self.raft.get_state()
+        return raft_pb2.GetStateReply(state=s['state'], term=s['term'], node_id=self.node_id, 
+                                     log_length=s['log_length'], commit_index=s['commit_index'])
+    
+    def cluster_state(self, timeout=0.5):
+        """Local state plus every peer's, queried concurrently; unreachable peers report OFFLINE."""
+        def _query(peer):
+            return self.comm.get_state(peer, timeout=timeout) or raft_pb2.GetStateReply(state="OFFLINE", term=-1, node_id=peer['id'])
+        with ThreadPoolExecutor(max_workers=len(self.peers) or 1) as ex:
+            return [self.state_reply()] + list(ex.map(_query, self.peers))
+    
     def serve(self):
         """Start the gRPC server and consensus logic."""
         self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
@@ -55,15 +78,29 @@ class RaftServicer(raft_pb2_grpc.RaftServiceServicer):
     def Ping(self, req, ctx): return raft_pb2.PingReply(receiver_id=self.node.node_id, message=f"Pong from {self.node.node_id}")
     def RequestVote(self, req, ctx): return self.node.raft.handle_request_vote(req)
     def AppendEntries(self, req, ctx): return self.node.raft.handle_append_entries(req)
-    def GetState(self, req, ctx):
-        s = self.node.raft.get_state()
-        return raft_pb2.GetStateReply(state=s['state'], term=s['term'], node_id=self.node.node_id, 
-                                     log_length=s['log_length'], commit_index=s['commit_index'])
+    def AppendEntriesStream(self, reqs, ctx):
+        for req in reqs: yield self.node.raft.handle_append_entries(req)
+    def InstallSnapshot(self, req, ctx): return self.node.raft.handle_install_snapshot(req)
+    def GetState(self, req, ctx): return self.node.state_reply()
+    def GetClusterState(self, req, ctx): return raft_pb2.ClusterStateReply(nodes=self.node.cluster_state())
+    def SubscribeState(self, req, ctx):
+        """Stream the node's state: the current snapshot, then one per change until the client leaves."""
+        raft, seen, last = self.node.raft, None, None
+        # Woken by _publish_state, and by the RPC ending so a departed client frees its worker at once
+        ctx.add_callback(raft.notify_state_waiters)
+        while ctx.is_active():
+            seen = raft.wait_state_change(seen, lambda: not ctx.is_active())
+            s = self.node.state_reply()
+            if s != last: yield s
+            last = s
     def SubmitCommand(self, req, ctx):
-        success, msg = self.node.raft.submit_command(req.command)
+        success, msg = self.node.raft.submit_command(*(req.commands or [req.command]))
         return raft_pb2.SubmitCommandReply(success=success, message=msg, leader_id=0 if success else -1)
     def GetData(self, req, ctx):
-        v = self.node.raft.state_machine.get(req.key)
+        if req.linearizable:
+            ok, v = self.node.raft.linearizable_read(req.key)
+            if not ok: return raft_pb2.GetDataReply(success=False, message=v)
+        else: v = self.node.raft.state_machine.get(req.key)
         return raft_pb2.GetDataReply(success=v is not None, value=v or "", message="OK" if v is not None else "Not found")
 
 class ControlServicer(control_pb2_grpc.ControlServiceServicer):
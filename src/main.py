@@ -4,11 +4,14 @@ from infrastructure.node import Node
 def main():
     p = argparse.ArgumentParser()
     p.add_argument('--id', type=int, required=True)
+    p.add_argument('--base-port', type=int, default=None, help='Serve the cluster on base_port + id')
+    p.add_argument('--data-dir', default='.', help='Directory for WAL files')
+    p.add_argument('--snapshot-every', type=int, default=10000, help='Compact the log once this many entries are applied past the last snapshot')
     args = p.parse_args()
     if args.id < 1 or args.id > 5:
         print("Error: ID 1-5")
         sys.exit(1)
-    Node(args.id).serve()
+    Node(args.id, base_port=args.base_port, data_dir=args.data_dir, snapshot_every=args.snapshot_every).serve()
 
 if __name__ == '__main__':
     main()
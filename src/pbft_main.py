@@ -11,13 +11,13 @@ class PBFTNode:
     """
     pBFT node wrapper handling configuration, gRPC service, and consensus logic.
     """
-    def __init__(self, node_id, config_path='pbft_nodes_config.json', malicious=False):
+    def __init__(self, node_id, config_path='pbft_nodes_config.json', malicious=False, max_batch=64, max_inflight=4):
         self.node_id = node_id
         config_file = os.path.join(os.path.dirname(__file__), '..', config_path)
         with open(config_file, 'r') as f: self.config = json.load(f)
         self.node_info = next(n for n in self.config if n['id'] == node_id)
         self.peers = [n for n in self.config if n['id'] != node_id]
-        self.pbft = PBFTConsensus(self, f=1)
+        self.pbft = PBFTConsensus(self, f=1, max_batch=max_batch, max_inflight=max_inflight)
         if malicious: self.pbft.set_malicious(True)
     
     def log(self, message, level="INFO"):
@@ -59,8 +59,10 @@ def main():
     p = argparse.ArgumentParser()
     p.add_argument('--id', type=int, required=True)
     p.add_argument('--malicious', action='store_true')
+    p.add_argument('--max-batch-size', type=int, default=64, help='Most queued client requests merged into one PrePrepare')
+    p.add_argument('--max-inflight', type=int, default=4, help='Most PrePrepares the primary keeps outstanding (1 serializes rounds)')
     args = p.parse_args()
-    PBFTNode(args.id, malicious=args.malicious).serve()
+    PBFTNode(args.id, malicious=args.malicious, max_batch=args.max_batch_size, max_inflight=args.max_inflight).serve()
 
 if __name__ == '__main__':
     main()
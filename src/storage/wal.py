@@ -1,35 +1,145 @@
 import json
 import os
+from array import array
 
 class WAL:
     """
     Write-Ahead Log for persistent storage of consensus state.
-    Uses atomic file operations for safe crash recovery.
+    Term and vote live in a small file replaced atomically; log entries are
+    appended as JSON lines to a second file, so a write costs O(new entries).
+    Entries folded into a snapshot are dropped from the log file, which then
+    starts with a {"base": index} header. Indexes passed in are absolute.
     """
-    
+
     def __init__(self, node_id, data_dir="."):
         self.node_id = node_id
-        # Note: filename matches cleanup expectations in test_all.py
+        # Note: filenames match cleanup expectations in test_all.py
         self.filepath = os.path.join(data_dir, f"wal_data_{node_id}.json")
+        self.logpath = os.path.join(data_dir, f"wal_data_{node_id}.jsonl")
+        self.snappath = os.path.join(data_dir, f"wal_data_{node_id}_snapshot.json")
+        # Index of the last entry before the log file's first record, and each record's byte offset
+        self._base = 0
+        self._offsets = array('q')
+        self._size = 0
         os.makedirs(data_dir, exist_ok=True)
-    
-    def save(self, term, voted_for, log):
-        """Save the current term, vote, and log entries to disk atomically."""
-        state = {'term': term, 'voted_for': voted_for, 'log': log}
-        tmp = self.filepath + '.tmp'
+
+    def _write_atomic(self, path, obj):
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(obj, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def save_meta(self, term, voted_for):
+        """Save the current term and vote to disk atomically. Returns False if the write failed."""
+        try: self._write_atomic(self.filepath, {'term': term, 'voted_for': voted_for})
+        except Exception: return False
+        return True
+
+    def append(self, start, terms, commands):
+        """
+        Make the log file hold exactly entries up to `start` followed by these, with one fsync.
+        Returns False if the write or fsync failed; the next call rewrites from the same point.
+        """
+        records = [(json.dumps([t, c]) + '\n').encode() for t, c in zip(terms, commands)]
+        keep = start - self._base
+        size = self._offsets[keep] if keep < len(self._offsets) else self._size
         try:
-            with open(tmp, 'w') as f: json.dump(state, f)
-            os.replace(tmp, self.filepath)
-        except Exception: pass
-    
-    def load(self):
-        """Load persisted state from disk. Returns (term, voted_for, log)."""
-        if not os.path.exists(self.filepath): return 0, None, []
+            fd = os.open(self.logpath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # Also cuts off whatever a failed earlier append left past the last good record
+                os.ftruncate(fd, size)
+                if records: os.write(fd, b''.join(records))
+                os.fsync(fd)
+                # The log is only read back on restart, so don't let it crowd the page cache
+                if hasattr(os, 'posix_fadvise'): os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally: os.close(fd)
+        except Exception: return False
+        # Offsets only move once the records are on disk
+        del self._offsets[keep:]
+        for r in records:
+            self._offsets.append(size)
+            size += len(r)
+        self._size = size
+        return True
+
+    def _rewrite_log(self, base, terms, commands):
+        """Replace the log file with a {"base": base} header and these entries (temp file, fsync, rename)."""
+        header = (json.dumps({'base': base}) + '\n').encode()
+        records = [(json.dumps([t, c]) + '\n').encode() for t, c in zip(terms, commands)]
+        tmp = self.logpath + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(header + b''.join(records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.logpath)
+        self._base, self._size, self._offsets = base, len(header), array('q')
+        for r in records:
+            self._offsets.append(self._size)
+            self._size += len(r)
+
+    def compact(self, index, term, data, terms, commands):
+        """
+        Save a state machine snapshot covering entries up to `index`, then rewrite the log file
+        with the entries after it. Returns False if either write failed.
+        """
         try:
-            with open(self.filepath, 'r') as f: s = json.load(f)
-            return s.get('term', 0), s.get('voted_for'), s.get('log', [])
-        except Exception: return 0, None, []
-    
+            # Snapshot first: after a crash in between, load() drops the records it covers and finishes the rewrite
+            self._write_atomic(self.snappath, {'index': index, 'term': term, 'data': data})
+            self._rewrite_log(index, terms, commands)
+        except Exception: return False
+        return True
+
+    def load(self):
+        """Load persisted state from disk. Returns (term, voted_for, snapshot, terms, commands), snapshot being (index, term, data) or None."""
+        s = {}
+        if os.path.exists(self.filepath):
+            try:
+                with open(self.filepath, 'r') as f: s = json.load(f)
+            except Exception: return 0, None, None, [], []
+        term, voted_for = s.get('term', 0), s.get('voted_for')
+
+        if 'log' in s or 'terms' in s:
+            # Older single-file layout: move its entries into the log file. The log file is replaced
+            # whole, so a crash before the meta file is rewritten just repeats the migration next time.
+            log = s.get('log', [])
+            terms = s.get('terms', [e['term'] for e in log])
+            commands = s.get('commands', [e['command'] for e in log])
+            self._rewrite_log(0, terms, commands)
+            self.save_meta(term, voted_for)
+            return term, voted_for, None, terms, commands
+
+        snapshot = None
+        if os.path.exists(self.snappath):
+            try:
+                with open(self.snappath, 'r') as f: snap = json.load(f)
+                snapshot = (snap['index'], snap['term'], snap['data'])
+            except Exception: pass
+
+        terms, commands = [], []
+        if os.path.exists(self.logpath):
+            with open(self.logpath, 'rb') as f:
+                for line in f:
+                    # A torn record at the tail is an append that never completed
+                    try: rec = json.loads(line)
+                    except ValueError: break
+                    if isinstance(rec, dict):
+                        self._base = rec['base']
+                        self._size += len(line)
+                        continue
+                    self._offsets.append(self._size)
+                    self._size += len(line)
+                    terms.append(rec[0])
+                    commands.append(rec[1])
+        if snapshot and self._base != snapshot[0]:
+            # A crash mid-compaction left records the snapshot already covers: finish the rewrite
+            skip = snapshot[0] - self._base
+            terms, commands = terms[skip:], commands[skip:]
+            self.compact(*snapshot, terms, commands)
+        return term, voted_for, snapshot, terms, commands
+
     def clear(self):
-        """Delete the WAL file for testing isolation."""
-        if os.path.exists(self.filepath): os.remove(self.filepath)
+        """Delete the WAL files for testing isolation."""
+        for path in (self.filepath, self.logpath, self.snappath):
+            if os.path.exists(path): os.remove(path)